@@ -2,17 +2,18 @@ import os
 import simplejson as json
 import boto3
 from botocore.exceptions import ClientError
-import requests
 from bs4 import BeautifulSoup
 from openai import OpenAI
 
+from .fetcher import fetch, validators, without_validators
 from .utils import get_openai_api_key, render_response
 from .prompts import CRITICAL_THINKING_CONTEXT
 
 
-def analyze_content(url):
-    # Scrape content
-    response = requests.get(url)
+def analyze_content(url, response=None):
+    # Scrape content, unless the page has already been fetched
+    if response is None:
+        response = fetch(url)
     soup = BeautifulSoup(response.content, "html.parser")
 
     # Extract text for summarization
@@ -130,20 +131,28 @@ def handler(event, context):
     dynamodb = boto3.resource("dynamodb")
     table = dynamodb.Table(os.environ["DYNAMODB_TABLE"])
 
-    if not force:
-        try:
-            record = table.get_item(Key={"url": url})
-            if "Item" in record:
-                print(f"EXISTING ANALYSIS: {json.dumps(record)}")
+    cached_item = None
+    try:
+        cached_item = table.get_item(Key={"url": url}).get("Item")
+    except ClientError as e:
+        print(e)
 
-                return handle_render(record["Item"], format=format)
-        except ClientError as e:
-            print(e)
+    if cached_item is not None and not force:
+        print(f"EXISTING ANALYSIS: {json.dumps(cached_item)}")
 
-    analyzed_content = analyze_content(url)
+        return handle_render(without_validators(cached_item), format=format)
+
+    # A forced refresh of an unchanged page reuses the cached analysis
+    response = fetch(url, cached_item)
+    if response is None:
+        print(f"NOT MODIFIED: {json.dumps(cached_item)}")
+
+        return handle_render(without_validators(cached_item), format=format)
+
+    analyzed_content = analyze_content(url, response)
     print(f"NEW ANALYSIS: {json.dumps(analyzed_content)}")
 
-    item = {"url": url, **analyzed_content}
+    item = {"url": url, **analyzed_content, **validators(response)}
     table.put_item(Item=item)
 
-    return handle_render(analyze_content, format=format)
+    return handle_render(analyzed_content, format=format)
@@ -0,0 +1,82 @@
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds, well within the functions' 180s timeout
+TIMEOUT = (5, 30)
+HEADERS = {
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+    # Every encoding requests can decode here: gzip and deflate, plus br/zstd if installed
+    "Accept-Encoding": DEFAULT_ACCEPT_ENCODING,
+}
+
+# Fields of a cached item that hold its page's validators
+VALIDATOR_FIELDS = ("etag", "last_modified")
+
+# The session lives as long as the Lambda execution environment, so warm
+# invocations reuse its pooled keep-alive connections.
+_session = None
+
+
+def get_session():
+    global _session
+    if _session is None:
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            # Retry gateway errors, but return the last response once the
+            # retries are used up, as an unpooled requests.get would, rather
+            # than raising RetryError
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.5,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=["GET"],
+                raise_on_status=False,
+            ),
+        )
+        session = requests.Session()
+        session.headers.update(HEADERS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        _session = session
+    return _session
+
+
+def conditional_headers(item):
+    headers = {}
+    if item and item.get("etag"):
+        headers["If-None-Match"] = item["etag"]
+    if item and item.get("last_modified"):
+        headers["If-Modified-Since"] = item["last_modified"]
+    return headers
+
+
+def fetch(url, cached_item=None):
+    """Fetch a page, or return None if the cached item's copy is still current.
+
+    The ETag and Last-Modified validators stored with cached_item are sent
+    along, so an unchanged page is answered with 304 Not Modified instead of
+    being downloaded again.
+    """
+    response = get_session().get(
+        url, headers=conditional_headers(cached_item), timeout=TIMEOUT
+    )
+    if response.status_code == 304:
+        return None
+    return response
+
+
+def validators(response):
+    """Return the validators of a response, to be stored with its cached item."""
+    headers = {
+        VALIDATOR_FIELDS[0]: response.headers.get("ETag"),
+        VALIDATOR_FIELDS[1]: response.headers.get("Last-Modified"),
+    }
+    return {key: value for key, value in headers.items() if value}
+
+
+def without_validators(item):
+    """Return a cached item without the validators stored with it, for rendering."""
+    return {key: value for key, value in item.items() if key not in VALIDATOR_FIELDS}
@@ -2,10 +2,10 @@ import os
 import json
 import boto3
 from botocore.exceptions import ClientError
-import requests
 from bs4 import BeautifulSoup
 from openai import OpenAI
 
+from .fetcher import fetch, validators, without_validators
 from .utils import get_openai_api_key, render_response
 from .prompts import SYSTEM_CONTEXT, SUMMARY_PROMPT
 
@@ -14,9 +14,10 @@ dynamodb = boto3.resource("dynamodb")
 table = dynamodb.Table(os.environ["DYNAMODB_TABLE"])
 
 
-def summarize_content(url):
-    # Scrape content
-    response = requests.get(url)
+def summarize_content(url, response=None):
+    # Scrape content, unless the page has already been fetched
+    if response is None:
+        response = fetch(url)
     soup = BeautifulSoup(response.content, "html.parser")
 
     # Extract text for summarization
@@ -83,21 +84,30 @@ def handler(event, context):
     force = event["queryStringParameters"].get("force", False)
     print(f"FORCE: {force}")
 
-    if force is False:
-        try:
-            record = table.get_item(Key={"url": url})
-            if "Item" in record:
-                print(f"EXISTING SUMMARY: {json.dumps(record)}")
-                return render_response(
-                    record["Item"], item_key="summary", format=response_format
-                )
-        except ClientError as e:
-            print(e)
-
-    summarized_content = summarize_content(url)
+    cached_item = None
+    try:
+        cached_item = table.get_item(Key={"url": url}).get("Item")
+    except ClientError as e:
+        print(e)
+
+    if cached_item is not None and force is False:
+        print(f"EXISTING SUMMARY: {json.dumps(cached_item)}")
+        return render_response(
+            without_validators(cached_item), item_key="summary", format=response_format
+        )
+
+    # A forced refresh of an unchanged page reuses the cached summary
+    response = fetch(url, cached_item)
+    if response is None:
+        print(f"NOT MODIFIED: {json.dumps(cached_item)}")
+        return render_response(
+            without_validators(cached_item), item_key="summary", format=response_format
+        )
+
+    summarized_content = summarize_content(url, response)
     print(f"NEW SUMMARY: {json.dumps(summarized_content)}")
 
-    item = {"url": url, **summarized_content}
+    item = {"url": url, **summarized_content, **validators(response)}
     table.put_item(Item=item)
 
     return render_response(
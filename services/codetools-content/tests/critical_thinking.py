@@ -2,7 +2,7 @@ import json
 import pytest
 import requests_mock
 from unittest.mock import patch, MagicMock
-from app.critical_thinking import analyze_content, handle_render
+from app.critical_thinking import analyze_content, handle_render, handler
 
 
 @pytest.fixture
@@ -125,5 +125,81 @@ def test_handle_render_non_html():
     assert json.loads(response["body"]) == content
 
 
+@pytest.fixture
+def cached_analysis():
+    """Fixture to return a cached analysis stored with its page's validators."""
+    return {
+        "url": "http://test.com",
+        "title": "Test Title",
+        "analysis": {"paragraphs": []},
+        "etag": '"abc"',
+        "last_modified": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+
+
+def mock_table(item):
+    table = MagicMock()
+    table.get_item.return_value = {"Item": item} if item else {}
+    return table
+
+
+def test_handler_cached_json_omits_validators(cached_analysis, monkeypatch_env):
+    table = mock_table(cached_analysis)
+    event = {"queryStringParameters": {"url": "http://test.com", "format": "json"}}
+
+    with patch("app.critical_thinking.boto3.resource") as mock_resource:
+        mock_resource.return_value.Table.return_value = table
+        response = handler(event, None)
+
+    body = json.loads(response["body"])
+    assert body["title"] == "Test Title"
+    assert "etag" not in body
+    assert "last_modified" not in body
+
+
+def test_handler_forced_refresh_not_modified(
+    requests_mock, cached_analysis, monkeypatch_env
+):
+    url = "http://test.com"
+    requests_mock.get(url, status_code=304)
+    table = mock_table(cached_analysis)
+    event = {"queryStringParameters": {"url": url, "format": "json", "force": "true"}}
+
+    with patch("app.critical_thinking.boto3.resource") as mock_resource, patch(
+        "app.critical_thinking.analyze_content"
+    ) as mock_analyze:
+        mock_resource.return_value.Table.return_value = table
+        response = handler(event, None)
+
+    assert requests_mock.last_request.headers["If-None-Match"] == '"abc"'
+    mock_analyze.assert_not_called()
+    table.put_item.assert_not_called()
+    assert response["statusCode"] == 200
+    body = json.loads(response["body"])
+    assert body["title"] == "Test Title"
+    assert "etag" not in body
+
+
+def test_handler_forced_refresh_modified(
+    requests_mock, mock_web_page, cached_analysis, monkeypatch_env
+):
+    url = "http://test.com"
+    requests_mock.get(url, text=mock_web_page, headers={"ETag": '"def"'})
+    table = mock_table(cached_analysis)
+    analysis = {"title": "New Title", "analysis": {"paragraphs": []}}
+    event = {"queryStringParameters": {"url": url, "format": "json", "force": "true"}}
+
+    with patch("app.critical_thinking.boto3.resource") as mock_resource, patch(
+        "app.critical_thinking.analyze_content", return_value=analysis
+    ):
+        mock_resource.return_value.Table.return_value = table
+        response = handler(event, None)
+
+    table.put_item.assert_called_once_with(
+        Item={"url": url, **analysis, "etag": '"def"'}
+    )
+    assert json.loads(response["body"]) == analysis
+
+
 # Ensure pytest is installed and run the tests with the following command:
 # pytest test_critical_thinking.py
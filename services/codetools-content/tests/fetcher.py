@@ -0,0 +1,64 @@
+import pytest
+import requests_mock
+from app import fetcher
+from app.fetcher import fetch, get_session, validators
+
+
+@pytest.fixture
+def mock_web_page():
+    """Fixture to return mock HTML content for web scraping."""
+    return "<html><head><title>Test Title</title></head><body>Test</body></html>"
+
+
+def test_get_session_is_reused():
+    assert get_session() is get_session()
+
+
+def test_fetch_sends_accept_encoding_and_timeout(requests_mock, mock_web_page):
+    url = "http://test.com"
+    requests_mock.get(url, text=mock_web_page)
+
+    response = fetch(url)
+    assert response.text == mock_web_page
+    request = requests_mock.last_request
+    assert "gzip" in request.headers["Accept-Encoding"]
+    assert "If-None-Match" not in request.headers
+    assert request.timeout == fetcher.TIMEOUT
+
+
+def test_fetch_sends_validators_of_cached_item(requests_mock):
+    url = "http://test.com"
+    requests_mock.get(url, status_code=304)
+    cached_item = {
+        "url": url,
+        "summary": "Test Summary",
+        "etag": '"abc"',
+        "last_modified": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
+
+    assert fetch(url, cached_item) is None
+    request = requests_mock.last_request
+    assert request.headers["If-None-Match"] == '"abc"'
+    assert request.headers["If-Modified-Since"] == "Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+def test_fetch_changed_page(requests_mock, mock_web_page):
+    url = "http://test.com"
+    requests_mock.get(url, text=mock_web_page, headers={"ETag": '"def"'})
+
+    response = fetch(url, {"url": url, "etag": '"abc"'})
+    assert response.status_code == 200
+    assert validators(response) == {"etag": '"def"'}
+
+
+def test_validators():
+    with requests_mock.Mocker() as m:
+        m.get(
+            "http://test.com",
+            headers={"ETag": '"abc"', "Last-Modified": "Wed, 21 Oct 2015 07:28:00 GMT"},
+        )
+        response = fetch("http://test.com")
+    assert validators(response) == {
+        "etag": '"abc"',
+        "last_modified": "Wed, 21 Oct 2015 07:28:00 GMT",
+    }
@@ -1,18 +1,30 @@
 import streamlit as st
-import yaml
 import glob
 import json
 import os
 import random
-import pandas as pd
-import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-import numpy as np
+import re
+import time
+import uuid
 
+from manifest import bank_hash, load_manifest
+from persistence import get_writer
+from quiz_index import QuizIndex
+from scoring import ScoreAggregator
 
-# Load questions from JSON files with error handling
+STATE_DIR = "current_test_state"
+DEBUG_PAGE_SIZE = 50
+
+
+# Load questions from the packed bank if present, else from JSON files with error handling
 def load_questions():
-    question_files = glob.glob("data/*.json")
+    from bank import open_bank  # Only needed once a session loads the bank
+
+    bank = open_bank("data")
+    if bank is not None:
+        return bank
+
+    question_files = sorted(glob.glob("data/*.json"))
     all_data = []
     for file in question_files:
         try:
@@ -24,109 +36,160 @@ def load_questions():
     return all_data
 
 
-# Transform questions into a structured format
+# Transform questions into a columnar bank joined by question id
 def transform_questions(input_data):
-    # Define a mapping from numeric difficulty to named difficulty levels
-    difficulty_mapping = {
-        1: "beginner",
-        2: "intermediate",
-        3: "advanced",
-        4: "expert",
-        5: "master",
-    }
-
-    transformed_data = []
-
-    for topic_info in input_data:
-        topic = topic_info["topic"]
-        questions = topic_info["questions"]
-        choices_info = topic_info["choices"]
-
-        for question in questions:
-            # Find the choices and correct answer for this question
-            for choice in choices_info:
-                if choice["question_id"] == question["id"]:
-                    # Map the numeric difficulty to a named level
-                    level = difficulty_mapping.get(question["difficulty"], "beginner")
-                    correct_answer = choice["choices"][choice["answer"]]
-                    transformed_question = {
-                        "topic": topic,
-                        "level": level,
-                        "question": question["question"],
-                        "choices": choice["choices"],
-                        "correct_answer": correct_answer,
-                        "selected_answer": None,
-                    }
-                    transformed_data.append(transformed_question)
-
-    return transformed_data
+    from bank import PackedBank, QuestionBank
+
+    if isinstance(input_data, PackedBank):
+        return QuestionBank.from_packed(input_data)
+    return QuestionBank.from_topics(input_data)
 
 
 def filter_questions(
-    questions, questions_per_level=50, included_topics=[], randomize_questions=False
+    questions,
+    questions_per_level=50,
+    included_topics=[],
+    randomize_questions=False,
+    seed=None,
+    text=None,
 ):
+    from bank import QuestionBank
+
+    # Only keep questions containing every word of text, as found by the search index
+    matches = get_search_index().search(text)[0] if text else None
+
+    # Select rows straight from the bank's bucket index and only materialize those
+    if isinstance(questions, QuestionBank):
+        rows = questions.select(
+            questions_per_level,
+            included_topics,
+            randomize=randomize_questions,
+            seed=seed,
+            rows=None if matches is None else questions.rows_of(matches),
+        )
+        return questions.records(rows)
+
+    if matches is not None:
+        matching_ids = set(get_search_index().question_ids(matches))
+        questions = [q for q in questions if q["id"] in matching_ids]
+
     # Filter questions by included topics if any are specified
     if included_topics:
+        included_topics = set(included_topics)
         questions = [q for q in questions if q["topic"] in included_topics]
 
-    filtered_questions = []
+    # Group questions by topic and level
+    questions_by_topic_level = {}
+    for question in questions:
+        key = (question["topic"], question["level"])
+        questions_by_topic_level.setdefault(key, []).append(question)
 
-    if randomize_questions:
-        # Group questions by topic and level
-        questions_by_topic_level = {}
-        for question in questions:
-            key = (question["topic"], question["level"])
-            if key not in questions_by_topic_level:
-                questions_by_topic_level[key] = []
-            questions_by_topic_level[key].append(question)
-
-        for _, qs in questions_by_topic_level.items():
-            # If questions_per_level is not specified or higher than the number of available questions, include all questions
-            limit = (
-                min(questions_per_level, len(qs)) if questions_per_level else len(qs)
-            )
-            # Randomly select questions
-            selected_qs = random.sample(qs, limit)
-            filtered_questions.extend(selected_qs)
-    else:
-        # If randomization is not required, simply limit the questions by questions_per_level
-        # This section needs to group questions by topic and level to correctly apply the limit
-        questions_by_topic_level = {}
-        for question in questions:
-            key = (question["topic"], question["level"])
-            if key not in questions_by_topic_level:
-                questions_by_topic_level[key] = []
-            questions_by_topic_level[key].append(question)
-
-        for _, qs in questions_by_topic_level.items():
-            limit = (
-                min(questions_per_level, len(qs)) if questions_per_level else len(qs)
-            )
+    rng = random.Random(seed)
+    filtered_questions = []
+    for qs in questions_by_topic_level.values():
+        # If questions_per_level is not specified or higher than the number of available questions, include all questions
+        limit = min(questions_per_level, len(qs)) if questions_per_level else len(qs)
+        if randomize_questions:
+            filtered_questions.extend(rng.sample(qs, limit))
+        else:
             filtered_questions.extend(qs[:limit])
 
     return filtered_questions
 
 
+# Process-wide counters for the shared question bank cache
+@st.cache_resource
+def question_bank_cache_stats():
+    return {"requests": 0, "builds": 0, "build_seconds": 0.0}
+
+
+# Build the question bank once per process and content hash; sessions share it read-only
+@st.cache_resource(show_spinner=False, max_entries=1)
+def build_question_bank(content_hash):
+    started = time.perf_counter()
+    bank = transform_questions(load_questions())
+    stats = question_bank_cache_stats()
+    stats["builds"] += 1
+    stats["build_seconds"] = time.perf_counter() - started
+    return bank
+
+
+def get_question_bank():
+    content_hash = bank_hash(load_manifest("data"))
+    question_bank_cache_stats()["requests"] += 1
+    return build_question_bank(content_hash)
+
+
+# Open the search index once per process and content hash, rebuilding it if stale
+@st.cache_resource(show_spinner=False, max_entries=1)
+def build_search_index(content_hash):
+    from search import open_index
+
+    return open_index("data")
+
+
+def get_search_index():
+    return build_search_index(bank_hash(load_manifest("data")))
+
+
 def load_data():
     if "data" not in st.session_state:
         load_state()
+    # Scores are aggregated once per session and then updated per answer
+    if "data" in st.session_state and "scores" not in st.session_state:
+        st.session_state.scores = ScoreAggregator(st.session_state.data)
+    # Topic and level ranges are indexed once per session, answers counted as they come
+    if "data" in st.session_state and "quiz_index" not in st.session_state:
+        st.session_state.quiz_index = QuizIndex(st.session_state.data)
+
+
+# Each browser session works on its own test, identified by the ?test= query parameter
+def get_test_id():
+    if "test_id" not in st.session_state:
+        test_id = st.query_params.get("test", "")
+        if not re.fullmatch(r"[A-Za-z0-9_-]{1,64}", test_id):
+            test_id = uuid.uuid4().hex
+            st.query_params["test"] = test_id
+        st.session_state.test_id = test_id
+    return st.session_state.test_id
+
+
+# The app state is a snapshot plus a journal of the actions dispatched since
+def get_journal():
+    if "journal" not in st.session_state:
+        from journal import Journal  # Only needed once a session loads its state
+
+        os.makedirs(STATE_DIR, exist_ok=True)
+        st.session_state.journal = Journal(
+            os.path.join(STATE_DIR, f"{get_test_id()}.yaml"), writer=get_writer()
+        )
+    return st.session_state.journal
+
+
+# Apply a journaled action to a serialized state
+def replay_action(state, entry):
+    if entry["name"] == "SELECT_ANSWER":
+        state["data"][entry["index"]]["selected_answer"] = entry["payload"]
+    else:
+        state["current_index"] = entry["index"]
+        state["quiz_complete"] = entry["quiz_complete"]
 
 
 # Load the app state
 def load_state():
-    if os.path.exists("current_test.yaml"):
+    journal = get_journal()
+    if journal.exists():
         try:
-            with open("current_test.yaml", "r") as file:
-                state = yaml.safe_load(file)
-                st.session_state.update(state)
+            state, entries = journal.load()
+            for entry in entries:
+                replay_action(state, entry)
+            st.session_state.update(state)
         except Exception as e:
             st.error(f"Failed to load state from file: {e}")
     else:
         try:
-            questions_raw = load_questions()
-            questions = transform_questions(questions_raw)
-            # Assuming filter_questions functionality is correctly implemented
-            questions = filter_questions(questions, questions_per_level=5)
+            # Only filtering and sampling happen per session; the bank is shared
+            questions = filter_questions(get_question_bank(), questions_per_level=5)
             st.session_state.data = questions
             st.session_state.current_index = 0
             # Save the initial state now that questions are loaded and filtered
@@ -141,6 +204,7 @@ def state_to_serializable(state_proxy):
     keys_to_serialize = [
         "data",
         "current_index",
+        "quiz_complete",
     ]
     for key in keys_to_serialize:
         if key in state_proxy:
@@ -148,14 +212,40 @@ def state_to_serializable(state_proxy):
     return serializable_state
 
 
-# Save the current state of the app to a YAML file with serialization
+# Save a compacted snapshot of the app state, clearing the journal
 def save_state():
     try:
         serializable_state = state_to_serializable(st.session_state)
-        with open("current_test.yaml", "w") as file:
-            yaml.safe_dump(serializable_state, file)
+        get_journal().snapshot(serializable_state)
+    except Exception as e:
+        st.error(f"Failed to save state to file: {e}")
+
+
+# Journal a dispatched action, compacting the journal once it grows long enough
+def record_action(entry):
+    journal = get_journal()
+    try:
+        journal.append(entry)
     except Exception as e:
         st.error(f"Failed to save state to file: {e}")
+        return
+    if journal.needs_compaction():
+        save_state()
+
+
+# Append the answers and passed levels of a completed quiz to the results warehouse
+def save_results():
+    from warehouse import append_session, quiz_levels, quiz_rows
+
+    try:
+        append_session(
+            "app",
+            get_test_id(),
+            quiz_rows(st.session_state.data),
+            quiz_levels(st.session_state.scores),
+        )
+    except Exception as e:
+        st.error(f"Failed to save results: {e}")
 
 
 def dispatch(action):
@@ -163,21 +253,44 @@ def dispatch(action):
     payload = action.get("payload", None)
 
     if name == "SELECT_ANSWER":
-        st.session_state.data[st.session_state.current_index][
-            "selected_answer"
-        ] = payload
+        question = st.session_state.data[st.session_state.current_index]
+        st.session_state.scores.select_answer(question, payload)
+        st.session_state.quiz_index.select_answer(question, payload)
+        question["selected_answer"] = payload
+        if "debug_frame" in st.session_state:
+            st.session_state.debug_frame.at[
+                st.session_state.current_index, "selected_answer"
+            ] = payload
+        record_action(
+            {"name": name, "index": st.session_state.current_index, "payload": payload}
+        )
     elif name == "GOTO_NEXT_QUESTION":
         if st.session_state.current_index < len(st.session_state.data) - 1:
             st.session_state.current_index += 1
         else:
             # New: Mark the quiz as complete if this was the last question
             st.session_state.quiz_complete = True
-        save_state()
+        record_action(
+            {
+                "name": name,
+                "index": st.session_state.current_index,
+                "quiz_complete": st.session_state.quiz_complete,
+            }
+        )
+        if st.session_state.quiz_complete:
+            get_journal().flush()  # Don't leave a finished quiz to the write-behind
+            save_results()
         st.rerun()
     elif name == "GOTO_PREVIOUS_QUESTION":
         if st.session_state.current_index > 0:
             st.session_state.current_index -= 1
-        save_state()
+        record_action(
+            {
+                "name": name,
+                "index": st.session_state.current_index,
+                "quiz_complete": st.session_state.quiz_complete,
+            }
+        )
         st.rerun()
     else:
         st.error(f"Unknown action: {name}")
@@ -188,40 +301,16 @@ def calculate_progress():
     topic = current_question["topic"]
     level = current_question["level"]
 
-    topic_questions = [q for q in st.session_state.data if q["topic"] == topic]
-    level_questions = [q for q in topic_questions if q["level"] == level]
-
-    topic_progress = sum(
-        1 for q in topic_questions if q["selected_answer"] is not None
-    ) / len(topic_questions)
-    level_progress = sum(
-        1 for q in level_questions if q["selected_answer"] is not None
-    ) / len(level_questions)
+    quiz_index = st.session_state.quiz_index
+    topic_progress = quiz_index.progress(topic)
+    level_progress = quiz_index.progress(topic, level)
 
     return topic_progress, level_progress, topic, level
 
 
+# Scores per topic and level, maintained incrementally by dispatch("SELECT_ANSWER")
 def calculate_scores_by_topic_and_level():
-    # Initialize a dictionary to store scores
-    scores = {}
-
-    for question in st.session_state.data:
-        topic = question["topic"]
-        level = question["level"]
-        key = (topic, level)  # Create a unique key for each topic and level combination
-
-        # Initialize the score entry if not present
-        if key not in scores:
-            scores[key] = {"correct": 0, "total": 0}
-
-        # Increment total questions
-        scores[key]["total"] += 1
-
-        # Increment correct answers
-        if question["selected_answer"] == question["correct_answer"]:
-            scores[key]["correct"] += 1
-
-    return scores
+    return st.session_state.scores.scores
 
 
 def calculate_highest_passing_level(scores):
@@ -253,45 +342,17 @@ def calculate_highest_passing_level(scores):
 
 
 def has_passed_current_level(topic, level):
-    scores_by_topic_and_level = calculate_scores_by_topic_and_level()
-    key = (topic, level)
-    if key in scores_by_topic_and_level:
-        score_info = scores_by_topic_and_level[key]
-        passed = score_info["correct"] / score_info["total"] > 0.5
-        return passed
-    return False  # Assume failure if no data available
+    return st.session_state.scores.has_passed(topic, level)
 
 
+# Index of the first question of the next topic, or None if there is no next topic
 def find_first_question_of_next_topic(current_topic):
-    current_found = False
-    for index, question in enumerate(st.session_state.data):
-        if question["topic"] == current_topic:
-            current_found = True
-        elif current_found:
-            return index  # Return the index of the first question of the next topic
-    return None  # Return None if no next topic is found
+    return st.session_state.quiz_index.next_topic_start(current_topic)
 
 
 def calculate_highest_level_per_topic():
-    scores = calculate_scores_by_topic_and_level()
-    # Initialize with all topics at level 0 (not started)
-    highest_levels = {
-        topic: 0 for topic in set(q["topic"] for q in st.session_state.data)
-    }
-
-    # Update with the highest level passed for each topic
-    for (topic, level), score in scores.items():
-        level_value = [
-            "beginner",
-            "intermediate",
-            "advanced",
-            "expert",
-            "master",
-        ].index(level) + 1
-        if score["correct"] / score["total"] > 0.5:  # Considered passing
-            highest_levels[topic] = max(highest_levels[topic], level_value)
-
-    return highest_levels
+    # Topics start at level 0 (not started) until a level is passed
+    return dict(st.session_state.scores.highest_levels)
 
 
 def insert_line_breaks(text, char_limit=10):
@@ -312,7 +373,9 @@ def insert_line_breaks(text, char_limit=10):
     return broken_text
 
 
-def plot_knowledge_level_chart(highest_levels):
+def build_knowledge_level_chart(highest_levels):
+    import plotly.graph_objects as go  # Only needed once there are results to show
+
     level_names = [
         "beginner",
         "intermediate",
@@ -350,15 +413,42 @@ def plot_knowledge_level_chart(highest_levels):
         title="Knowledge Levels per Topic",
     )
 
-    fig = go.Figure(data=data, layout=layout)
+    return go.Figure(data=data, layout=layout)
+
+
+# Build the chart and its SVG export once per session for each set of highest levels
+def get_knowledge_level_chart(highest_levels):
+    levels_key = tuple(highest_levels.items())
+    cached = st.session_state.get("knowledge_level_chart")
+    if cached is None or cached[0] != levels_key:
+        from chart_export import knowledge_level_svg
+
+        cached = (
+            levels_key,
+            build_knowledge_level_chart(highest_levels),
+            knowledge_level_svg(highest_levels),
+        )
+        st.session_state.knowledge_level_chart = cached
+    return cached[1], cached[2]
+
+
+def plot_knowledge_level_chart(highest_levels, key=None):
+    fig, svg = get_knowledge_level_chart(highest_levels)
 
     # Show the figure in the Streamlit app
-    st.plotly_chart(fig)
+    st.plotly_chart(fig, key=key)
+    st.download_button(
+        "Download chart (SVG)",
+        svg,
+        file_name="knowledge_levels.svg",
+        mime="image/svg+xml",
+        key=key and f"{key}_svg",
+    )
 
 
-def render_performance_chart():
+def render_performance_chart(key=None):
     highest_levels = calculate_highest_level_per_topic()
-    plot_knowledge_level_chart(highest_levels)
+    plot_knowledge_level_chart(highest_levels, key=key)
 
 
 def render_sidebar():
@@ -367,7 +457,7 @@ def render_sidebar():
         render_topic_tree()
 
 
-def render_results():
+def render_results(key=None):
     # scores = calculate_scores_by_topic_and_level()
     # highest_passing_levels = calculate_highest_passing_level(scores)
     # passed_topics = [
@@ -379,7 +469,7 @@ def render_results():
     # for topic, level in passed_topics:
     #     st.write(f"**{topic}:** {level}")
 
-    render_performance_chart()
+    render_performance_chart(key=key)
 
 
 def render_navigation():
@@ -412,19 +502,15 @@ def render_topic_tree():
         "expert",
         "master",
     ]
-    seen = set()
-    topics = [
-        q["topic"]
-        for q in st.session_state.data
-        if q["topic"] not in seen and not seen.add(q["topic"])
-    ]
+    quiz_index = st.session_state.quiz_index
+    topics = quiz_index.topics
     current_question_topic = st.session_state.data[st.session_state.current_index][
         "topic"
     ]
     current_question_level = st.session_state.data[st.session_state.current_index][
         "level"
     ]
-    current_question_topic_index = topics.index(current_question_topic)
+    current_question_topic_index = quiz_index.topic_positions[current_question_topic]
     completed_icon = ":white_check_mark:"
     incomplete_icon = ":hourglass_flowing_sand:"
 
@@ -457,35 +543,72 @@ def render_topic_tree():
                     st.markdown(f"{level.capitalize()}: Not Started")
 
 
+# The debugger's table is built once per session and updated in place as answers come in
+def get_debug_frame():
+    if "debug_frame" not in st.session_state:
+        import pandas as pd  # Only needed once the debugger is switched on
+
+        st.session_state.debug_frame = pd.DataFrame.from_records(
+            st.session_state.data,
+            columns=[
+                "topic",
+                "level",
+                "correct_answer",
+                "selected_answer",
+                "question",
+                "choices",
+            ],
+        )
+    return st.session_state.debug_frame
+
+
 def render_debugger():
-    data = st.session_state.data
+    # Nothing is computed for the debugger unless it is switched on
+    if not st.toggle("Show debugger", key="show_debugger"):
+        return
+    import pandas as pd
+
     current_index = st.session_state.current_index
     quiz_complete = st.session_state.quiz_complete
     questions_count = len(st.session_state.data)
     scores_by_topic_and_level = calculate_scores_by_topic_and_level()
-    # choices = [datum["choices"] for datum in data]
-    choices = data
     st.markdown(
         f"current_index: **{current_index}** | quiz_complete: **{quiz_complete}** | questions count: **{questions_count}**"
     )
-    choices_df = pd.DataFrame.from_records(choices)
+    cache_stats = question_bank_cache_stats()
+    col1, col2 = st.columns(2)
+    col1.metric(
+        "Question bank cache hits",
+        cache_stats["requests"] - cache_stats["builds"],
+        help=f"{cache_stats['builds']} build(s) for {cache_stats['requests']} request(s)",
+    )
+    col2.metric(
+        "Question bank build time", f"{cache_stats['build_seconds'] * 1000:.0f} ms"
+    )
+
+    # Only one page of the table is sent to the browser per rerun
+    choices_df = get_debug_frame()
+    page_count = max(1, -(-len(choices_df) // DEBUG_PAGE_SIZE))
     st.subheader("Data")
-    st.dataframe(
-        choices_df,
-        column_order=(
-            "topic",
-            "level",
-            "correct_answer",
-            "selected_answer",
-            "question",
-            "choices",
-        ),
+    page = st.number_input(
+        f"Page (of {page_count})",
+        min_value=1,
+        max_value=page_count,
+        key="debug_page",
     )
+    start = (page - 1) * DEBUG_PAGE_SIZE
+    st.dataframe(choices_df.iloc[start : start + DEBUG_PAGE_SIZE])
 
     st.subheader("Scores")
-    for score in scores_by_topic_and_level:
-        # st.write(score)
-        st.write(score, scores_by_topic_and_level[score])
+    st.dataframe(
+        pd.DataFrame.from_records(
+            [
+                {"topic": topic, "level": level, **score}
+                for (topic, level), score in scores_by_topic_and_level.items()
+            ]
+        ),
+        hide_index=True,
+    )
 
 
 def render_questions():
@@ -501,7 +624,9 @@ def render_questions():
             dispatch({"name": "SELECT_ANSWER", "payload": selected_answer})
             dispatch({"name": "GOTO_NEXT_QUESTION"})
     else:
-        render_results()  # Display results if quiz is complete
+        # Display results if quiz is complete; the Results tab shows them too,
+        # so the chart needs its own key
+        render_results(key="questions_results")
 
 
 def main():
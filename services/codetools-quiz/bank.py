@@ -0,0 +1,514 @@
+import json
+import mmap
+import os
+import random
+import struct
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+
+from config import SKILL_LEVELS
+from manifest import bank_hash, load_manifest
+
+# Packed question bank layout (all integers little-endian):
+#
+#   header    magic, version, the content hash of the question files it was
+#             packed from (manifest.bank_hash), counts and the offset of
+#             every section below
+#   topics    one record per topic: name (pool offset/length), first question
+#             and question count; questions of a topic are contiguous
+#   questions one fixed-size record per question: id and text (pool
+#             offset/length), first choice, choice count, topic, difficulty
+#             and the index of the correct choice (NO_ANSWER if the bank had
+#             no choices entry for the question)
+#   choices   one record per choice: text (pool offset/length)
+#   pool      UTF-8 string pool; identical strings are stored once
+#
+# The file is memory-mapped and records are only decoded when a topic or
+# question is requested, so opening a bank costs the same regardless of size.
+
+BANK_FILE = "questions.bank"
+BANK_MAGIC = b"CTQB"
+BANK_VERSION = 2
+NO_ANSWER = 0xFF
+
+HEADER = struct.Struct("<4sHH32sIIIIIII")
+TOPIC_RECORD = struct.Struct("<IIII")
+QUESTION_RECORD = struct.Struct("<IIIIIHBBB3x")
+CHOICE_RECORD = struct.Struct("<II")
+
+# NumPy views of the question and choice records, used as the columns of a
+# QuestionBank. The packed file can be viewed in place without copying.
+QUESTION_DTYPE = np.dtype(
+    {
+        "names": [
+            "id_offset",
+            "id_length",
+            "text_offset",
+            "text_length",
+            "first_choice",
+            "topic",
+            "difficulty",
+            "answer",
+            "choice_count",
+        ],
+        "formats": ["<u4", "<u4", "<u4", "<u4", "<u4", "<u2", "u1", "u1", "u1"],
+        "offsets": [0, 4, 8, 12, 16, 20, 22, 23, 24],
+        "itemsize": QUESTION_RECORD.size,
+    }
+)
+CHOICE_DTYPE = np.dtype([("offset", "<u4"), ("length", "<u4")])
+
+
+class StringPool:
+    """Accumulate unique strings and hand out their pool offsets."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.offsets = {}
+
+    def add(self, value):
+        """Add a string to the pool, returning its (offset, length)."""
+        if value not in self.offsets:
+            encoded = value.encode("utf-8")
+            self.offsets[value] = (len(self.buffer), len(encoded))
+            self.buffer.extend(encoded)
+        return self.offsets[value]
+
+
+def compile_bank(topics):
+    """Join each topic's questions to their choices in one pass.
+
+    Returns the topic, question and choice records of the packed layout along
+    with the string pool they point into.
+    """
+    pool = StringPool()
+    topic_records, question_records, choice_records = [], [], []
+
+    for topic_data in topics:
+        choices_by_question = {
+            item["question_id"]: item for item in topic_data.get("choices", [])
+        }
+        topic_id = len(topic_records)
+        first_question = len(question_records)
+        for question in topic_data.get("questions", []):
+            choice_info = choices_by_question.get(question["id"])
+            first_choice = len(choice_records)
+            if choice_info is None:
+                choice_count, answer = 0, NO_ANSWER
+            else:
+                for text in choice_info["choices"]:
+                    choice_records.append(pool.add(text))
+                choice_count, answer = (
+                    len(choice_info["choices"]),
+                    choice_info["answer"],
+                )
+            question_records.append(
+                (
+                    *pool.add(question["id"]),
+                    *pool.add(question["question"]),
+                    first_choice,
+                    topic_id,
+                    question["difficulty"],
+                    answer,
+                    choice_count,
+                )
+            )
+        topic_records.append(
+            (
+                *pool.add(topic_data.get("topic", "")),
+                first_question,
+                len(question_records) - first_question,
+            )
+        )
+
+    return topic_records, question_records, choice_records, pool
+
+
+def read_topic_files(data_dir="data"):
+    """Yield the parsed JSON question files in data_dir in name order."""
+    for file in sorted(Path(data_dir).glob("*.json")):
+        with open(file, "r") as f:
+            yield json.load(f)
+
+
+def pack_bank(data_dir="data", output=None):
+    """Compile the JSON question files in data_dir into a single packed bank."""
+    data_dir = Path(data_dir)
+    output = Path(output) if output else data_dir / BANK_FILE
+    content_hash = bank_hash(load_manifest(data_dir))
+    topic_records, question_records, choice_records, pool = compile_bank(
+        read_topic_files(data_dir)
+    )
+
+    topics_offset = HEADER.size
+    questions_offset = topics_offset + TOPIC_RECORD.size * len(topic_records)
+    choices_offset = questions_offset + QUESTION_RECORD.size * len(question_records)
+    pool_offset = choices_offset + CHOICE_RECORD.size * len(choice_records)
+
+    fd, tmp_output = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    BANK_MAGIC,
+                    BANK_VERSION,
+                    0,
+                    bytes.fromhex(content_hash),
+                    len(topic_records),
+                    len(question_records),
+                    len(choice_records),
+                    topics_offset,
+                    questions_offset,
+                    choices_offset,
+                    pool_offset,
+                )
+            )
+            for record in topic_records:
+                f.write(TOPIC_RECORD.pack(*record))
+            for record in question_records:
+                f.write(QUESTION_RECORD.pack(*record))
+            for record in choice_records:
+                f.write(CHOICE_RECORD.pack(*record))
+            f.write(pool.buffer)
+        os.replace(tmp_output, output)
+    except BaseException:
+        os.unlink(tmp_output)
+        raise
+    return output
+
+
+class PackedBank(Sequence):
+    """Read-only, memory-mapped view of a packed bank.
+
+    Behaves as a sequence of topics in the same shape as the JSON files
+    ({"topic", "questions", "choices"}); each topic is decoded on access.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            _,
+            content_hash,
+            self.topic_count,
+            self.question_count,
+            self.choice_count,
+            self.topics_offset,
+            self.questions_offset,
+            self.choices_offset,
+            self.pool_offset,
+        ) = HEADER.unpack_from(self.buffer, 0)
+        if magic != BANK_MAGIC or version != BANK_VERSION:
+            self.buffer.close()
+            raise ValueError(f"{self.path} is not a version {BANK_VERSION} bank")
+        self.content_hash = content_hash.hex()
+
+    def close(self):
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.topic_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.topic_count))]
+        if index < 0:
+            index += self.topic_count
+        if not 0 <= index < self.topic_count:
+            raise IndexError("topic index out of range")
+        return self.topic(index)
+
+    def string(self, offset, length):
+        """Decode a string from the pool."""
+        start = self.pool_offset + offset
+        return self.buffer[start : start + length].decode("utf-8")
+
+    def topic_record(self, index):
+        """Return the raw (name_offset, name_length, first_question, count) record."""
+        return TOPIC_RECORD.unpack_from(
+            self.buffer, self.topics_offset + index * TOPIC_RECORD.size
+        )
+
+    def topic_name(self, index):
+        """Return the name of a topic without decoding its questions."""
+        name_offset, name_length, _, _ = self.topic_record(index)
+        return self.string(name_offset, name_length)
+
+    def topic_names(self):
+        """Return the names of all topics in bank order."""
+        return [self.topic_name(i) for i in range(self.topic_count)]
+
+    def question_record(self, index):
+        """Return the raw fixed-size record of a question."""
+        return QUESTION_RECORD.unpack_from(
+            self.buffer, self.questions_offset + index * QUESTION_RECORD.size
+        )
+
+    def choice_texts(self, first_choice, choice_count):
+        """Decode the choice texts of a question."""
+        texts = []
+        for index in range(first_choice, first_choice + choice_count):
+            offset, length = CHOICE_RECORD.unpack_from(
+                self.buffer, self.choices_offset + index * CHOICE_RECORD.size
+            )
+            texts.append(self.string(offset, length))
+        return texts
+
+    def topic(self, index):
+        """Materialize a topic in the same shape as its JSON source file."""
+        name_offset, name_length, first_question, question_count = self.topic_record(
+            index
+        )
+        questions, choices = [], []
+        for q in range(first_question, first_question + question_count):
+            (
+                id_offset,
+                id_length,
+                text_offset,
+                text_length,
+                first_choice,
+                _,
+                difficulty,
+                answer,
+                choice_count,
+            ) = self.question_record(q)
+            question_id = self.string(id_offset, id_length)
+            questions.append(
+                {
+                    "id": question_id,
+                    "difficulty": difficulty,
+                    "question": self.string(text_offset, text_length),
+                }
+            )
+            if answer != NO_ANSWER:
+                choices.append(
+                    {
+                        "choices": self.choice_texts(first_choice, choice_count),
+                        "answer": answer,
+                        "question_id": question_id,
+                    }
+                )
+        return {
+            "topic": self.string(name_offset, name_length),
+            "questions": questions,
+            "choices": choices,
+        }
+
+
+def open_bank(data_dir="data"):
+    """Open the packed bank in data_dir, or return None if there is none.
+
+    A bank whose content hash no longer matches the question files in
+    data_dir (files changed, added or removed, whatever their modification
+    times) is packed again first. None is also returned if that fails.
+    """
+    data_dir = Path(data_dir)
+    path = data_dir / BANK_FILE
+    if not path.exists():
+        return None
+    content_hash = bank_hash(load_manifest(data_dir))
+    try:
+        bank = PackedBank(path)
+    except (OSError, ValueError, struct.error):
+        bank = None
+    if bank is not None and bank.content_hash == content_hash:
+        return bank
+    if bank is not None:
+        bank.close()
+    try:
+        pack_bank(data_dir, path)
+        return PackedBank(path)
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+class QuestionBank:
+    """Columnar store of questions already joined to their choices.
+
+    Topic id, difficulty, correct-answer index and string offsets live in NumPy
+    columns; question and choice texts are only decoded from the string pool
+    for the rows that are actually materialized into quiz records. Questions
+    without a choices entry are dropped.
+    """
+
+    def __init__(self, topic_names, questions, choices, pool):
+        unanswerable = questions["answer"] == NO_ANSWER
+        # Position of each row among all of the bank's questions, as numbered
+        # by compile_bank (and the search index)
+        self.source_rows = np.flatnonzero(~unanswerable)
+        if unanswerable.any():
+            questions = questions[~unanswerable]
+        self.topic_names = topic_names
+        self.questions = questions
+        self.choices = choices
+        self.pool = pool
+        # Difficulties outside the known range map to the first level.
+        difficulty = questions["difficulty"].astype(np.int64)
+        in_range = (difficulty >= 1) & (difficulty <= len(SKILL_LEVELS))
+        self.level = np.where(in_range, difficulty - 1, 0).astype(np.uint8)
+        self.topic = questions["topic"]
+        # Bucket index: rows sorted by (topic, level), and each bucket's
+        # (start, count) slice of that order, grouped by topic. Topics and
+        # their buckets are listed in the order they first appear in the bank.
+        keys = self.bucket_keys()
+        self.bucket_order = np.argsort(keys, kind="stable")
+        bucket_keys, starts, counts = np.unique(
+            keys[self.bucket_order], return_index=True, return_counts=True
+        )
+        self.buckets_by_topic = {}
+        for bucket in np.argsort(self.bucket_order[starts], kind="stable"):
+            topic_id = int(bucket_keys[bucket]) // len(SKILL_LEVELS)
+            self.buckets_by_topic.setdefault(topic_id, []).append(
+                (int(starts[bucket]), int(counts[bucket]))
+            )
+        # The bank is shared between sessions, so none of it may be modified.
+        for column in (
+            self.questions,
+            self.choices,
+            self.level,
+            self.bucket_order,
+            self.source_rows,
+        ):
+            column.flags.writeable = False
+
+    @classmethod
+    def from_topics(cls, topics):
+        """Build a bank from topics shaped like the JSON question files."""
+        topic_records, question_records, choice_records, pool = compile_bank(topics)
+        pool_bytes = bytes(pool.buffer)
+        return cls(
+            [
+                pool_bytes[offset : offset + length].decode("utf-8")
+                for offset, length, _, _ in topic_records
+            ],
+            np.array(question_records, dtype=QUESTION_DTYPE),
+            np.array(choice_records, dtype=CHOICE_DTYPE),
+            pool_bytes,
+        )
+
+    @classmethod
+    def from_packed(cls, packed):
+        """Build a bank over a PackedBank's memory map without copying its records."""
+        return cls(
+            packed.topic_names(),
+            np.frombuffer(
+                packed.buffer,
+                dtype=QUESTION_DTYPE,
+                count=packed.question_count,
+                offset=packed.questions_offset,
+            ),
+            np.frombuffer(
+                packed.buffer,
+                dtype=CHOICE_DTYPE,
+                count=packed.choice_count,
+                offset=packed.choices_offset,
+            ),
+            memoryview(packed.buffer)[packed.pool_offset :],
+        )
+
+    def __len__(self):
+        return len(self.questions)
+
+    def string(self, offset, length):
+        """Decode a string from the pool."""
+        return bytes(self.pool[offset : offset + length]).decode("utf-8")
+
+    def bucket_keys(self):
+        """Return one integer key per row identifying its (topic, level) bucket."""
+        return self.topic.astype(np.int64) * len(SKILL_LEVELS) + self.level
+
+    def rows_of(self, source_rows):
+        """Return the rows of questions given by their compile_bank numbers.
+
+        Questions that were dropped for having no choices are left out.
+        """
+        source_rows = np.asarray(source_rows, dtype=np.int64)
+        positions = np.searchsorted(self.source_rows, source_rows)
+        positions[positions == len(self.source_rows)] = 0
+        return positions[self.source_rows[positions] == source_rows]
+
+    def select(
+        self,
+        questions_per_level=50,
+        included_topics=None,
+        randomize=False,
+        seed=None,
+        rows=None,
+    ):
+        """Return the rows of up to questions_per_level questions per (topic, level).
+
+        Buckets are returned in the order they first appear in the bank and
+        rows within a bucket keep bank order unless randomized. Randomized
+        draws sample positions within each bucket's slice of the bucket index,
+        so the cost is proportional to the number of questions selected and
+        the same seed always yields the same quiz. If rows is given, only
+        those rows are selected from.
+        """
+        rng = random.Random(seed)
+        if rows is not None:
+            allowed = np.zeros(len(self), dtype=bool)
+            allowed[rows] = True
+        if included_topics:
+            included_topics = set(included_topics)
+            topic_ids = [
+                topic_id
+                for topic_id in self.buckets_by_topic
+                if self.topic_names[topic_id] in included_topics
+            ]
+        else:
+            topic_ids = self.buckets_by_topic
+
+        selected = []
+        for topic_id in topic_ids:
+            for start, count in self.buckets_by_topic[topic_id]:
+                bucket = self.bucket_order[start : start + count]
+                if rows is not None:
+                    bucket = bucket[allowed[bucket]]
+                    count = len(bucket)
+                limit = (
+                    min(questions_per_level, count) if questions_per_level else count
+                )
+                if randomize:
+                    positions = np.fromiter(
+                        rng.sample(range(count), limit), dtype=np.intp, count=limit
+                    )
+                    selected.append(bucket[positions])
+                else:
+                    selected.append(bucket[:limit])
+        return np.concatenate(selected) if selected else np.empty(0, dtype=np.intp)
+
+    def record(self, row):
+        """Materialize a single row as a quiz question record."""
+        question = self.questions[row]
+        first_choice = question["first_choice"]
+        choices = [
+            self.string(offset, length)
+            for offset, length in self.choices[
+                first_choice : first_choice + question["choice_count"]
+            ]
+        ]
+        return {
+            "id": self.string(question["id_offset"], question["id_length"]),
+            "topic": self.topic_names[question["topic"]],
+            "level": SKILL_LEVELS[self.level[row]],
+            "question": self.string(question["text_offset"], question["text_length"]),
+            "choices": choices,
+            "correct_answer": choices[question["answer"]],
+            "selected_answer": None,
+        }
+
+    def records(self, rows):
+        """Materialize rows as quiz question records."""
+        return [self.record(row) for row in rows]
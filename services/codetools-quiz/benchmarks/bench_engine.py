@@ -0,0 +1,262 @@
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import click
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import streamlit as st  # noqa: E402
+import streamlit.logger  # noqa: E402
+
+import app  # noqa: E402
+import cli  # noqa: E402
+from bank import pack_bank  # noqa: E402
+from journal import Journal  # noqa: E402
+from scoring import ScoreAggregator  # noqa: E402
+from search import open_index, write_index  # noqa: E402
+
+# Session state is used outside a script run; don't warn about it on every access
+streamlit.logger.set_log_level("error")
+
+TOPIC_COUNT = 30
+QUESTIONS_PER_LEVEL = 20  # At 1x, matching the bank in data/
+WORDS = (
+    "what which how why when does is the a an of in for to with between "
+    "service data cloud pipeline deployment security model network test "
+    "function class branch commit container cluster query index cache "
+    "latency throughput replica partition schema token policy resource"
+).split()
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def generate_bank(directory, scale, seed=0):
+    """Write a synthetic bank with the data/*.json schema, scale times the real size."""
+    rng = random.Random(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    question_count = 0
+    for topic_index in range(TOPIC_COUNT):
+        questions, choices = [], []
+        for difficulty in range(1, 6):
+            for _ in range(QUESTIONS_PER_LEVEL * scale):
+                question_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+                questions.append(
+                    {
+                        "id": question_id,
+                        "difficulty": difficulty,
+                        "question": sentence(rng, 10) + "?",
+                    }
+                )
+                choices.append(
+                    {
+                        "choices": [sentence(rng, 6) for _ in range(4)],
+                        "answer": rng.randrange(4),
+                        "question_id": question_id,
+                    }
+                )
+        with open(directory / f"topic_{topic_index}_data.json", "w") as f:
+            json.dump(
+                {
+                    "topic": f"Topic {topic_index}",
+                    "questions": questions,
+                    "choices": choices,
+                },
+                f,
+            )
+        question_count += len(questions)
+    return question_count
+
+
+def measure(fn, repeat):
+    """Return the best wall time over repeat runs and the peak traced memory of one run."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_bytes": peak}
+
+
+@contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def benchmark_scale(scale, repeat):
+    """Benchmark every hot path against a synthetic bank of the given scale."""
+    results = []
+
+    def record(name, fn, questions):
+        results.append(
+            {"function": name, "scale": scale, "questions": questions}
+            | measure(fn, repeat)
+        )
+
+    with tempfile.TemporaryDirectory() as workdir, working_directory(workdir):
+        question_count = generate_bank("data", scale)
+
+        record("load_questions[json]", app.load_questions, question_count)
+        raw = app.load_questions()
+        record(
+            "transform_questions", lambda: app.transform_questions(raw), question_count
+        )
+        bank = app.transform_questions(raw)
+        record(
+            "filter_questions",
+            lambda: app.filter_questions(bank, 5, randomize_questions=True, seed=0),
+            question_count,
+        )
+
+        record("write_index", lambda: write_index("data"), question_count)
+        index = open_index("data")
+        record(
+            "SearchIndex.search",
+            lambda: index.search("cache latency", limit=20),
+            question_count,
+        )
+        record(
+            "filter_questions[text]",
+            lambda: app.filter_questions(bank, 5, text="cache latency"),
+            question_count,
+        )
+        index.close()
+
+        pack_bank("data")
+        record("load_questions[packed]", app.load_questions, question_count)
+        packed = app.load_questions()
+        record(
+            "transform_questions[packed]",
+            lambda: app.transform_questions(packed),
+            question_count,
+        )
+
+        # Session-level paths run against a quiz that grows with the bank: the
+        # app's five questions per level, times the scale.
+        quiz = app.filter_questions(bank, questions_per_level=5 * scale)
+        for question in quiz[::2]:
+            question["selected_answer"] = question["correct_answer"]
+        st.session_state.clear()
+        st.session_state.data = quiz
+        st.session_state.current_index = 0
+        st.session_state.quiz_complete = False
+        st.session_state.scores = ScoreAggregator(quiz)
+        st.session_state.journal = Journal("current_test.yaml")
+
+        record("ScoreAggregator", lambda: ScoreAggregator(quiz), len(quiz))
+        record(
+            "calculate_scores_by_topic_and_level",
+            app.calculate_scores_by_topic_and_level,
+            len(quiz),
+        )
+
+        def save_state():
+            app.save_state()
+            st.session_state.journal.flush()
+
+        def load_state():
+            del st.session_state["data"]
+            app.load_state()
+
+        record("save_state", save_state, len(quiz))
+        record("load_state", load_state, len(quiz))
+
+        topics = cli.load_questions()
+        test = cli.KnowledgeTest(topics, "benchmark")
+
+        def update_state():
+            test.update_state()
+            test.journal.flush()
+
+        record("KnowledgeTest.update_state", update_state, question_count)
+        st.session_state.clear()
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print how each measurement changed relative to a previous run."""
+    with open(baseline_path, "r") as f:
+        baseline = {(r["function"], r["scale"]): r for r in json.load(f)["results"]}
+    print(f"{'function':<40}{'scale':>7}{'time':>10}{'memory':>10}", file=sys.stderr)
+    for result in results:
+        previous = baseline.get((result["function"], result["scale"]))
+        if previous is None:
+            continue
+        time_ratio = result["seconds"] / max(previous["seconds"], 1e-9)
+        memory_ratio = result["peak_bytes"] / max(previous["peak_bytes"], 1)
+        print(
+            f"{result['function']:<40}{result['scale']:>6}x"
+            f"{time_ratio:>9.2f}x{memory_ratio:>9.2f}x",
+            file=sys.stderr,
+        )
+
+
+@click.command(help="Benchmark the quiz engine's hot paths on synthetic banks.")
+@click.option(
+    "--scales",
+    default="1,10,100",
+    help="Bank sizes to run, as multiples of the real bank, separated by commas.",
+)
+@click.option("--repeat", default=3, help="Timed runs per measurement.")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write JSON here.")
+@click.option(
+    "--compare",
+    "baseline",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Previous JSON results to print ratios against.",
+)
+def main(scales, repeat, output, baseline):
+    results = []
+    for scale in (int(scale) for scale in scales.split(",")):
+        results.extend(benchmark_scale(scale, repeat))
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(report, indent=2, sort_keys=True))
+    if baseline:
+        compare(results, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+from streamlit.testing.v1 import AppTest
+
+APP_DIR = Path(__file__).resolve().parent.parent
+SECTIONS = ["render_sidebar", "render_questions", "render_results", "render_debugger"]
+
+# Session state is read outside a script run; don't warn about it on every access
+logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").addFilter(
+    lambda record: False
+)
+
+
+def quiz_script(app_dir, state_dir, questions_per_level, sections):
+    """Run app.main() with each render section timed into session state.
+
+    AppTest runs this function's source as the app script, so it has to do
+    its own imports.
+    """
+    import sys
+    import time
+
+    import streamlit as st
+
+    sys.path.insert(0, app_dir)
+    import app
+
+    def timed(name, function):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings = st.session_state.rerun_timings
+                timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+        wrapper.timed = True
+        return wrapper
+
+    # The app module is imported once per process, so only wrap it once
+    for name in sections:
+        if not getattr(getattr(app, name), "timed", False):
+            setattr(app, name, timed(name, getattr(app, name)))
+
+    app.STATE_DIR = state_dir
+    st.session_state.setdefault("rerun_timings", {})
+    if "data" not in st.session_state:
+        st.session_state.data = app.filter_questions(
+            app.get_question_bank(), questions_per_level=questions_per_level
+        )
+        st.session_state.current_index = 0
+        app.save_state()
+
+    started = time.perf_counter()
+    try:
+        app.main()
+    finally:
+        timings = st.session_state.rerun_timings
+        timings["script"] = timings.get("script", 0.0) + time.perf_counter() - started
+        timings["runs"] = timings.get("runs", 0) + 1
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(samples):
+    """Summarize a list of durations in seconds as milliseconds."""
+    return {
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 0.5) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+def run_quiz(questions_per_level, timeout, debugger):
+    """Answer every question of one quiz, timing each answer's reruns."""
+    with tempfile.TemporaryDirectory() as state_dir:
+        os.environ["QUIZ_WAREHOUSE"] = os.path.join(state_dir, "results")
+        at = AppTest.from_function(
+            quiz_script,
+            default_timeout=timeout,
+            kwargs={
+                "app_dir": str(APP_DIR),
+                "state_dir": state_dir,
+                "questions_per_level": questions_per_level,
+                "sections": SECTIONS,
+            },
+        )
+        at.session_state["show_debugger"] = debugger
+        at.run()
+        if at.exception:
+            raise click.ClickException(str(at.exception))
+        questions = len(at.session_state["data"])
+
+        reruns = []
+        while not at.session_state["quiz_complete"]:
+            at.session_state["rerun_timings"] = {}
+            radio = at.radio[0]
+            started = time.perf_counter()
+            radio.set_value(radio.options[0]).run()
+            wall = time.perf_counter() - started
+            if at.exception:
+                raise click.ClickException(str(at.exception))
+            reruns.append(dict(at.session_state["rerun_timings"], wall=wall))
+
+    report = {
+        "questions_per_level": questions_per_level,
+        "questions": questions,
+        "answers": len(reruns),
+        "script_runs_per_answer": statistics.fmean(r["runs"] for r in reruns),
+        "wall": summarize([r["wall"] for r in reruns]),
+        "script": summarize([r["script"] for r in reruns]),
+    }
+    for name in SECTIONS:
+        report[name] = summarize([r.get(name, 0.0) for r in reruns])
+    return report
+
+
+@click.command(help="Time the app's reruns while answering a full quiz headlessly.")
+@click.option(
+    "--questions-per-level",
+    "sizes",
+    default="1,2,5",
+    help="Quiz sizes to run, as questions per topic and level, separated by commas.",
+)
+@click.option("--timeout", default=30.0, help="Timeout for a single rerun, in seconds.")
+@click.option(
+    "--debugger/--no-debugger",
+    default=False,
+    help="Answer with the debugger switched on.",
+)
+@click.option("--output", type=click.Path(dir_okay=False), help="Write JSON here.")
+def main(sizes, timeout, debugger, output):
+    os.chdir(APP_DIR)  # The app reads data/ relative to the working directory
+    results = [run_quiz(int(size), timeout, debugger) for size in sizes.split(",")]
+
+    print(
+        f"{'questions':>10}{'wall p50':>12}{'script p50':>12}", file=sys.stderr, end=""
+    )
+    for name in SECTIONS:
+        print(f"{name.removeprefix('render_'):>12}", file=sys.stderr, end="")
+    print(file=sys.stderr)
+    for result in results:
+        print(
+            f"{result['questions']:>10}{result['wall']['p50_ms']:>12.1f}"
+            f"{result['script']['p50_ms']:>12.1f}",
+            file=sys.stderr,
+            end="",
+        )
+        for name in SECTIONS:
+            print(f"{result[name]['p50_ms']:>12.1f}", file=sys.stderr, end="")
+        print(file=sys.stderr)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import click
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+
+def import_profile(module):
+    """Import a module in a fresh interpreter and return its -X importtime profile.
+
+    Returns the module's cumulative import time and the self time of every
+    module it imported, both in milliseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    self_times, total = {}, None
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        self_times[name.strip()] = int(self_us) / 1000
+        if name.strip() == module and not name.startswith("  "):
+            total = int(cumulative_us) / 1000
+    return total, self_times
+
+
+def command_time(args):
+    """Return the wall time of running the CLI with args, in milliseconds."""
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "cli.py", *args],
+        cwd=APP_DIR,
+        capture_output=True,
+        check=True,
+    )
+    return (time.perf_counter() - started) * 1000
+
+
+@click.command(
+    help="Profile the quiz entry points' startup and check it against budgets."
+)
+@click.option("--runs", default=5, help="Fresh interpreters to start per measurement.")
+@click.option(
+    "--cli-budget-ms",
+    default=100.0,
+    help="Fail if importing cli.py takes longer than this.",
+)
+@click.option(
+    "--app-budget-ms",
+    default=1000.0,
+    help="Fail if importing app.py takes longer than this.",
+)
+@click.option("--top", default=10, help="Slowest imports to list per entry point.")
+def main(runs, cli_budget_ms, app_budget_ms, top):
+    report, over_budget = {}, []
+    for module, budget in (("cli", cli_budget_ms), ("app", app_budget_ms)):
+        profiles = [import_profile(module) for _ in range(runs)]
+        import_ms = statistics.median(total for total, _ in profiles)
+        slowest = sorted(
+            profiles[-1][1].items(), key=lambda item: item[1], reverse=True
+        )[:top]
+        report[module] = {
+            "import_ms": round(import_ms, 1),
+            "budget_ms": budget,
+            "slowest_imports_ms": {name: round(ms, 1) for name, ms in slowest},
+        }
+        if import_ms > budget:
+            over_budget.append(module)
+
+    report["cli_commands_ms"] = {
+        " ".join(args): round(
+            statistics.median(command_time(args) for _ in range(runs)), 1
+        )
+        for args in (["--help"], ["list-topics"])
+    }
+    print(json.dumps(report, indent=2))
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import click
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import replay_action  # noqa: E402
+from journal import Journal  # noqa: E402
+
+SHARED_JOURNAL = "shared.yaml"
+
+
+def make_state(questions):
+    """Build a quiz state shaped like the app's session state."""
+    return {
+        "data": [
+            {
+                "topic": f"Topic {i // 25}",
+                "level": "beginner",
+                "question": f"Question {i}?",
+                "choices": ["a", "b", "c", "d"],
+                "correct_answer": "a",
+                "selected_answer": None,
+            }
+            for i in range(questions)
+        ],
+        "current_index": 0,
+        "quiz_complete": False,
+    }
+
+
+def answer_questions(state, journal, indexes):
+    """Answer questions of state the way the app's dispatch does, saving each action.
+
+    Returns the latency of each save in seconds.
+    """
+    last = len(state["data"]) - 1
+    latencies = []
+    for index in indexes:
+        for entry in (
+            {"name": "SELECT_ANSWER", "index": index, "payload": "abcd"[index % 4]},
+            {
+                "name": "GOTO_NEXT_QUESTION",
+                "index": min(index + 1, last),
+                "quiz_complete": index == last,
+            },
+        ):
+            started = time.perf_counter()
+            replay_action(state, entry)
+            journal.append(entry)
+            if journal.needs_compaction():
+                journal.snapshot(state)
+            latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def run_session(args):
+    """Answer every question of one session in its own journal."""
+    state_dir, session, questions = args
+    journal = Journal(Path(state_dir) / f"session-{session}.yaml")
+    state = make_state(questions)
+    journal.snapshot(state)
+    return answer_questions(state, journal, range(questions))
+
+
+def run_shared_writer(args):
+    """Answer one writer's share of the questions in the journal all writers share.
+
+    Every append contends for the one journal lock. The writers never compact,
+    since a snapshot of one writer's state would drop the others' answers.
+    """
+    state_dir, writer, writers, questions = args
+    journal = Journal(Path(state_dir) / SHARED_JOURNAL, compact_every=None)
+    state = make_state(writers * questions)
+    return answer_questions(
+        state, journal, range(writer * questions, (writer + 1) * questions)
+    )
+
+
+def saved_state(path):
+    """Return the state a journal replays to."""
+    state, entries = Journal(path).load()
+    for entry in entries:
+        replay_action(state, entry)
+    return state
+
+
+def expected_answers(questions):
+    return ["abcd"[index % 4] for index in range(questions)]
+
+
+def verify_session(state_dir, session, questions):
+    """Check that a session's saved state replays to the answers it gave."""
+    state = saved_state(Path(state_dir) / f"session-{session}.yaml")
+    answers = [q["selected_answer"] for q in state["data"]]
+    return answers == expected_answers(questions) and state["quiz_complete"] is True
+
+
+def verify_shared(state_dir, writers, questions):
+    """Check that the shared journal replays to every writer's answers."""
+    state = saved_state(Path(state_dir) / SHARED_JOURNAL)
+    answers = [q["selected_answer"] for q in state["data"]]
+    return answers == expected_answers(writers * questions)
+
+
+def latency_report(latencies, elapsed):
+    """Summarize the save latencies of a run that took elapsed seconds."""
+    latencies = sorted(latencies)
+    return {
+        "saves": len(latencies),
+        "saves_per_second": round(len(latencies) / elapsed),
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3),
+    }
+
+
+@click.command(help="Save state from many concurrent quiz sessions and check it.")
+@click.option("--sessions", default=32, help="Number of concurrent sessions.")
+@click.option("--questions", default=150, help="Questions answered per session.")
+@click.option("--workers", default=os.cpu_count(), help="Number of worker processes.")
+@click.option(
+    "--shared-writers",
+    default=8,
+    help="Number of writers sharing one journal and lock (0 to skip).",
+)
+@click.option(
+    "--p99-budget-ms",
+    default=50.0,
+    help="Fail if the 99th percentile per-session save latency exceeds this.",
+)
+def main(sessions, questions, workers, shared_writers, p99_budget_ms):
+    with tempfile.TemporaryDirectory() as state_dir:
+        started = time.perf_counter()
+        with Pool(workers) as pool:
+            results = pool.map(
+                run_session,
+                [(state_dir, session, questions) for session in range(sessions)],
+            )
+        elapsed = time.perf_counter() - started
+        corrupted = [
+            session
+            for session in range(sessions)
+            if not verify_session(state_dir, session, questions)
+        ]
+
+    report = {
+        "sessions": sessions,
+        **latency_report(
+            [latency for result in results for latency in result], elapsed
+        ),
+        "corrupted_sessions": corrupted,
+    }
+    shared_corrupted = False
+    if shared_writers:
+        with tempfile.TemporaryDirectory() as state_dir:
+            Journal(Path(state_dir) / SHARED_JOURNAL).snapshot(
+                make_state(shared_writers * questions)
+            )
+            started = time.perf_counter()
+            with Pool(min(workers, shared_writers)) as pool:
+                results = pool.map(
+                    run_shared_writer,
+                    [
+                        (state_dir, writer, shared_writers, questions)
+                        for writer in range(shared_writers)
+                    ],
+                )
+            elapsed = time.perf_counter() - started
+            shared_corrupted = not verify_shared(state_dir, shared_writers, questions)
+        report["shared_journal"] = {
+            "writers": shared_writers,
+            **latency_report(
+                [latency for result in results for latency in result], elapsed
+            ),
+            "corrupted": shared_corrupted,
+        }
+
+    print(json.dumps(report, indent=2))
+    if corrupted or shared_corrupted or report["p99_ms"] > p99_budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
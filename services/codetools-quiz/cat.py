@@ -0,0 +1,87 @@
+import numpy as np
+
+from config import SKILL_LEVELS
+from simulator import skill_profiles
+
+GUESS_RATE = 0.25  # Four choices per question
+DISCRIMINATION = 1.7
+# Abilities the posterior is tracked over; the standard normal prior is negligible past +-4
+THETA_GRID = np.linspace(-4.0, 4.0, 161)
+
+
+def item_information(p_correct, guess_rate=GUESS_RATE, discrimination=DISCRIMINATION):
+    """Return the Fisher information of three-parameter logistic items."""
+    return (
+        discrimination**2
+        * ((p_correct - guess_rate) / (1 - guess_rate)) ** 2
+        * (1 - p_correct)
+        / p_correct
+    )
+
+
+# Items are parameterized by their difficulty field alone (difficulty from
+# simulator.LEVEL_DIFFICULTIES, shared discrimination and guess rate), so one
+# column per level covers every item in the bank. Rows are THETA_GRID points.
+P_CORRECT = skill_profiles(THETA_GRID, GUESS_RATE, DISCRIMINATION)
+LOG_P_CORRECT = np.log(P_CORRECT)
+LOG_P_INCORRECT = np.log1p(-P_CORRECT)
+INFORMATION = item_information(P_CORRECT)
+LOG_PRIOR = -(THETA_GRID**2) / 2
+
+
+class AdaptiveSession:
+    """Computerized adaptive test of one topic.
+
+    Keeps the posterior over THETA_GRID of the candidate's ability, estimated
+    as its mean (EAP), and picks the next question from the level that is
+    most informative at that estimate among the levels with questions left.
+    The topic is finished once the posterior's standard deviation falls to
+    target_se, max_questions have been asked or no questions are left.
+    """
+
+    def __init__(self, level_counts, target_se=0.4, max_questions=20):
+        self.remaining = np.array(
+            [level_counts.get(level, 0) for level in range(1, len(SKILL_LEVELS) + 1)]
+        )
+        self.asked = {level: 0 for level in range(1, len(SKILL_LEVELS) + 1)}
+        self.target_se = target_se
+        self.max_questions = max_questions
+        self.log_posterior = LOG_PRIOR.copy()
+        self.question_count = 0
+
+    def record(self, level, correct):
+        """Update the ability posterior with the answer to a question of a level."""
+        table = LOG_P_CORRECT if correct else LOG_P_INCORRECT
+        self.log_posterior += table[:, level - 1]
+        self.remaining[level - 1] -= 1
+        self.asked[level] += 1
+        self.question_count += 1
+
+    def estimate(self):
+        """Return the ability estimate and its standard error."""
+        weights = np.exp(self.log_posterior - self.log_posterior.max())
+        weights /= weights.sum()
+        theta = weights @ THETA_GRID
+        return float(theta), float(np.sqrt(weights @ (THETA_GRID - theta) ** 2))
+
+    def next_level(self):
+        """Return the level to ask next, or None once the topic is finished."""
+        theta, standard_error = self.estimate()
+        if (
+            standard_error <= self.target_se
+            or self.question_count >= self.max_questions
+            or not self.remaining.any()
+        ):
+            return None
+        row = min(np.searchsorted(THETA_GRID, theta), len(THETA_GRID) - 1)
+        information = np.where(self.remaining > 0, INFORMATION[row], -np.inf)
+        return int(information.argmax()) + 1
+
+    def placement(self, mastery=0.8):
+        """Return how many levels the estimate answers correctly with probability >= mastery.
+
+        Matches the simulator's definition of a candidate's true level.
+        """
+        theta, _ = self.estimate()
+        p_correct = skill_profiles(np.array([theta]), GUESS_RATE, DISCRIMINATION)[0]
+        return int((p_correct >= mastery).sum())
@@ -0,0 +1,74 @@
+import math
+from xml.sax.saxutils import escape
+
+from config import SKILL_LEVELS
+
+# One fill per highest level, from not started (0) to master
+LEVEL_COLORS = ["#f0f0f0", "#440154", "#3b528b", "#21918c", "#5ec962", "#fde725"]
+
+
+def polar_point(cx, cy, radius, degrees):
+    """Return the point at radius and angle, measured clockwise from 12 o'clock."""
+    radians = math.radians(degrees)
+    return cx + radius * math.sin(radians), cy - radius * math.cos(radians)
+
+
+def knowledge_level_svg(highest_levels, size=640):
+    """Render the knowledge level chart as a standalone SVG document.
+
+    Draws the same picture as the app's Plotly chart, one wedge per topic
+    whose length is the topic's highest passed level, without needing Plotly
+    or a browser, so results can be saved and shared as a plain file.
+    """
+    topics = list(highest_levels)
+    margin = size * 0.22
+    cx = cy = size / 2
+    radius = size / 2 - margin
+    ring = radius / len(SKILL_LEVELS)
+    sweep = 360 / max(len(topics), 1)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" '
+        f'viewBox="0 0 {size} {size}" font-family="sans-serif" font-size="11">',
+        f'<rect width="{size}" height="{size}" fill="white"/>',
+        f'<text x="{cx}" y="20" text-anchor="middle" font-size="16">'
+        "Knowledge Levels per Topic</text>",
+    ]
+    for level in range(1, len(SKILL_LEVELS) + 1):
+        parts.append(
+            f'<circle cx="{cx}" cy="{cy}" r="{ring * level:.2f}" fill="none" '
+            'stroke="#ccc"/>'
+        )
+    for index, topic in enumerate(topics):
+        level = highest_levels[topic]
+        start, end = index * sweep, (index + 1) * sweep
+        if level:
+            length = ring * level
+            if len(topics) == 1:
+                parts.append(
+                    f'<circle cx="{cx}" cy="{cy}" r="{length:.2f}" '
+                    f'fill="{LEVEL_COLORS[level]}" fill-opacity="0.7" stroke="black"/>'
+                )
+            else:
+                x1, y1 = polar_point(cx, cy, length, start)
+                x2, y2 = polar_point(cx, cy, length, end)
+                large_arc = 1 if sweep > 180 else 0
+                parts.append(
+                    f'<path d="M {cx} {cy} L {x1:.2f} {y1:.2f} '
+                    f'A {length:.2f} {length:.2f} 0 {large_arc} 1 {x2:.2f} {y2:.2f} Z" '
+                    f'fill="{LEVEL_COLORS[level]}" fill-opacity="0.7" stroke="black"/>'
+                )
+        middle = (start + end) / 2
+        x, y = polar_point(cx, cy, radius + 8, middle)
+        anchor = "start" if 0 < middle < 180 else "end" if middle > 180 else "middle"
+        parts.append(
+            f'<text x="{x:.2f}" y="{y:.2f}" text-anchor="{anchor}" '
+            f'dominant-baseline="middle">{escape(topic)}</text>'
+        )
+    for level, name in enumerate(SKILL_LEVELS, start=1):
+        parts.append(
+            f'<text x="{cx + 3}" y="{cy - ring * level + 12:.2f}" fill="#666">'
+            f"{name}</text>"
+        )
+    parts.append("</svg>")
+    return "\n".join(parts)
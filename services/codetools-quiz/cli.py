@@ -1,13 +1,18 @@
 import click
 import json
-import os
-import re
-import yaml
+from datetime import datetime
 from pathlib import Path
-from random import randint, choice, shuffle
+from random import Random, randint, choice
+
+from manifest import bank_hash, load_manifest, to_snake_case
+
+# Modules that pull in numpy, yaml or sqlite3 are imported by the code that
+# needs them, so commands like list-topics and --help start instantly.
 
 CONSECUTIVE_PASS_THRESHOLD = 5
 CONSECUTIVE_FAIL_THRESHOLD = 3
+CAT_TARGET_SE = 0.4
+CAT_MAX_QUESTIONS = 20
 DIFFICULTY_LEVEL_NAMES = [
     "",
     "Beginner",
@@ -18,12 +23,6 @@ DIFFICULTY_LEVEL_NAMES = [
 ]
 
 
-def to_snake_case(s):
-    """Convert a string to snake case, replacing spaces and dashes."""
-    s = s.replace(" ", "_").replace("-", "_")
-    return re.sub(r"(?<!^)(?=[A-Z])", "_", s).lower()
-
-
 def generate_test_name():
     """Generate a unique, human-friendly name for the test."""
     adjectives = ["mighty", "curious", "speedy", "brave", "smart"]
@@ -37,72 +36,245 @@ def load_questions(excluded_topics=None, included_topics=None):
     if excluded_topics is not None and included_topics is not None:
         raise ValueError("Specify either excluded_topics or included_topics, not both.")
 
-    files = Path("./data").glob("*.json")
+    from bank import open_bank
+
+    bank = open_bank("./data")
+    if bank is not None:
+        with bank:
+            return [
+                bank.topic(index)
+                for index, name in enumerate(bank.topic_names())
+                if is_selected_topic(
+                    to_snake_case(name), excluded_topics, included_topics
+                )
+            ]
+
+    # The manifest lists every file's topic, so only selected files are parsed
     topics = []
-    for file in files:
-        with open(file, "r") as f:
-            topic_data = json.load(f)
-            topic = to_snake_case(topic_data.get("topic", ""))
-            if included_topics and topic in included_topics:
-                topics.append(topic_data)
-            elif excluded_topics and topic not in excluded_topics:
-                topics.append(topic_data)
-            elif not included_topics and not excluded_topics:
-                topics.append(topic_data)
+    for entry in load_manifest("./data"):
+        if is_selected_topic(entry["key"], excluded_topics, included_topics):
+            with open(Path("./data") / entry["path"], "r") as f:
+                topics.append(json.load(f))
     return topics
 
 
+def is_selected_topic(topic, excluded_topics=None, included_topics=None):
+    """Check a snake case topic key against the included or excluded topics."""
+    if included_topics:
+        return topic in included_topics
+    if excluded_topics:
+        return topic not in excluded_topics
+    return True
+
+
 class KnowledgeTest:
-    def __init__(self, topics, test_name):
+    mode = "levels"
+
+    def __init__(self, topics, test_name, store=None):
         self.topics = topics
         self.test_name = test_name
-        self.state_file = f"{self.test_name}_state.yaml"
-        (
-            self.results,
-            self.loaded_questions,
-            self.current_topic_index,
-            self.current_question_index,
-            self.consecutive_correct,
-            self.consecutive_incorrect,
-        ) = self.load_state()
+        self.store = store
+        self.journal = self.open_journal(test_name, store)
+        self.load_state()
+        self.level_records = [
+            self.join_level_records(topic) for topic in self.loaded_questions
+        ]
+
+    @staticmethod
+    def open_journal(test_name, store=None):
+        """Return the state journal of a test, in the SQLite store if one is given."""
+        if store is not None:
+            return store.test(test_name)
+        from journal import Journal
+        from persistence import get_writer
+
+        return Journal(
+            f"{test_name}_state.yaml", compact_every=None, writer=get_writer()
+        )
+
+    @staticmethod
+    def saved_state(test_name, store=None):
+        """Return the latest snapshot of a saved test, or None if there is none."""
+        journal = KnowledgeTest.open_journal(test_name, store)
+        if not journal.exists():
+            return None
+        state, _ = journal.load()
+        return state
+
+    @staticmethod
+    def saved_topic_keys(state):
+        """Return the topic keys of a saved test's snapshot."""
+        if "questions" in state:  # State saved with the full question bank
+            return [to_snake_case(topic["topic"]) for topic in state["questions"]]
+        return state["topics"]
+
+    def topics_hash(self, topic_keys):
+        """Return the content hash of the question files behind the given topics."""
+        return bank_hash(
+            [entry for entry in load_manifest("./data") if entry["key"] in topic_keys]
+        )
 
     def load_state(self):
         """Load test state from file, or initialize state if file does not exist."""
-        if os.path.exists(self.state_file):
-            with open(self.state_file, "r") as file:
-                state = yaml.safe_load(file)
-                return (
-                    state.get("results", {}),
-                    state.get("questions", self.topics),
-                    state.get("current_topic_index", 0),
-                    state.get("current_question_index", 0),
-                    state.get("consecutive_correct", 0),
-                    state.get("consecutive_incorrect", 0),
-                )
-        else:
-            results = {
+        self.current_topic_index = 0
+        self.current_level = 1
+        self.current_question_index = 0
+        self.consecutive_correct = 0
+        self.consecutive_incorrect = 0
+        if not self.journal.exists():
+            self.loaded_questions = self.topics
+            self.topic_keys = [to_snake_case(t["topic"]) for t in self.topics]
+            self.bank_hash = self.topics_hash(self.topic_keys)
+            self.seed = randint(0, 2**32 - 1)
+            self.results = {
                 topic["topic"]: {
                     "passed_levels": [],
                     "correct_answers": {i: 0 for i in range(1, 6)},
                 }
                 for topic in self.topics
             }
-            return results, self.topics, 0, 0, 0, 0
+            self.update_state(clear_log=True)  # Drop any log left by an older test
+            return
+
+        state, answers = self.journal.load()
+        if "questions" in state:  # State saved with the full question bank
+            self.loaded_questions = state["questions"]
+            self.topic_keys = [to_snake_case(t["topic"]) for t in state["questions"]]
+        else:
+            topics_by_key = {to_snake_case(t["topic"]): t for t in self.topics}
+            self.topic_keys = state["topics"]
+            self.loaded_questions = [topics_by_key[key] for key in self.topic_keys]
+        self.bank_hash = self.topics_hash(self.topic_keys)
+        if state.get("bank_hash", self.bank_hash) != self.bank_hash:
+            print("Warning: the question bank changed since this test was saved.\n")
+        self.seed = state.get("seed", 0)
+        self.results = state.get("results", {})
+        self.current_topic_index = state.get("current_topic_index", 0)
+        self.current_level = state.get("current_level", 1)
+        self.current_question_index = state.get("current_question_index", 0)
+        self.consecutive_correct = state.get("consecutive_correct", 0)
+        self.consecutive_incorrect = state.get("consecutive_incorrect", 0)
+        for answer in answers[state.get("answers_applied", 0) :]:
+            self.replay_answer(answer)
+
+    def replay_answer(self, answer):
+        """Restore the cursors and counters recorded with a logged answer."""
+        self.current_topic_index = answer["topic_index"]
+        self.current_level = answer["level"]
+        self.current_question_index = answer["next_question_index"]
+        self.consecutive_correct = answer["consecutive_correct"]
+        self.consecutive_incorrect = answer["consecutive_incorrect"]
+        topic_name = self.loaded_questions[answer["topic_index"]]["topic"]
+        self.results[topic_name]["correct_answers"][answer["level"]] = answer[
+            "correct_answers"
+        ]
+
+    def join_level_records(self, topic):
+        """Join a topic's questions to their choices, grouped by level.
+
+        Returns a list of question records per difficulty level, each in this
+        test's reproducible shuffled order, so questions can be asked by
+        position without searching the topic.
+        """
+        choices_by_id = {item["question_id"]: item for item in topic["choices"]}
+        questions_by_level = {level: [] for level in range(1, 6)}
+        for question in topic["questions"]:
+            if question["difficulty"] in questions_by_level:
+                questions_by_level[question["difficulty"]].append(question)
+
+        key = to_snake_case(topic["topic"])
+        level_records = {}
+        for level, questions in questions_by_level.items():
+            Random(f"{self.seed}:{key}:{level}").shuffle(questions)
+            level_records[level] = [
+                {
+                    "id": question["id"],
+                    "question": question["question"],
+                    "choices": choices_by_id[question["id"]]["choices"],
+                    "answer": choices_by_id[question["id"]]["answer"],
+                }
+                for question in questions
+                if question["id"] in choices_by_id
+            ]
+        return level_records
 
     def run_test(self):
         """Run or resume the knowledge test."""
         print(f"\nTest Name: {self.test_name}\n")
-        for topic in self.loaded_questions[self.current_topic_index :]:
-            self.process_topic(topic)
+        for topic_index in range(self.current_topic_index, len(self.loaded_questions)):
+            self.process_topic(topic_index)
+        self.journal.flush()
         self.show_results()
-
-    def process_topic(self, topic):
+        if self.store is not None:
+            self.store.mark_completed(self.test_name)
+        self.save_results()
+
+    def save_results(self):
+        """Append the completed test's answers and levels to the results warehouse."""
+        from warehouse import append_session
+
+        try:
+            rows = self.result_rows()
+            append_session("cli", self.test_name, rows, self.level_rows(rows))
+        except Exception as e:
+            print(f"Failed to save results to the warehouse: {e}")
+
+    def result_rows(self):
+        """Return warehouse rows for the answers in the test's log."""
+        records = {
+            record["id"]: record
+            for level_records in self.level_records
+            for records in level_records.values()
+            for record in records
+        }
+        _, answers = self.journal.load()
+        rows = []
+        for answer in answers:
+            if answer["answer"] == 6:
+                continue  # Proceeded to the next topic without answering
+            selected = answer["answer"] - 1 if 1 <= answer["answer"] <= 4 else -1
+            record = records.get(answer["question_id"])
+            rows.append(
+                {
+                    "topic": self.loaded_questions[answer["topic_index"]]["topic"],
+                    "level": answer["level"],
+                    "question_id": answer["question_id"],
+                    "selected": selected,
+                    "correct": record is not None and selected == record["answer"],
+                }
+            )
+        return rows
+
+    def level_rows(self, rows):
+        """Return warehouse levels for the levels reached, given the answer rows.
+
+        A level is reached once one of its questions was answered or it was
+        passed; it is passed if it is in the topic's passed_levels.
+        """
+        answered = {(row["topic"], row["level"]) for row in rows}
+        levels = []
+        for topic in self.loaded_questions:
+            passed_levels = self.results[topic["topic"]]["passed_levels"]
+            for level in range(1, 6):
+                if level in passed_levels or (topic["topic"], level) in answered:
+                    levels.append(
+                        {
+                            "topic": topic["topic"],
+                            "level": level,
+                            "passed": level in passed_levels,
+                        }
+                    )
+        return levels
+
+    def process_topic(self, topic_index):
         """Process a single topic within the test."""
-        self.current_topic_index = self.loaded_questions.index(topic)
+        self.current_topic_index = topic_index
+        topic = self.loaded_questions[topic_index]
         current_topic_results = self.results[topic["topic"]]
         print(f"Topic: {topic['topic']}\n")
 
-        for difficulty_level in range(1, 6):
+        for difficulty_level in range(self.current_level, 6):
+            self.current_level = difficulty_level
             if difficulty_level in current_topic_results["passed_levels"]:
                 continue  # Skip difficulty level if already passed
 
@@ -113,17 +285,16 @@ class KnowledgeTest:
             )
 
         self.current_question_index = 0  # Reset for the next topic
+        self.current_level = 1
         self.reset_consecutive_counters()
 
     def process_difficulty_level(self, topic, difficulty_level, current_topic_results):
         """Process questions for a specific difficulty level within a topic."""
-        questions = [
-            q for q in topic["questions"] if q["difficulty"] == difficulty_level
-        ]
-        shuffle(questions)  # Shuffle questions for randomness
+        questions = self.level_records[self.current_topic_index][difficulty_level]
 
-        for question in questions[self.current_question_index :]:
-            self.current_question_index = questions.index(question)
+        for index in range(self.current_question_index, len(questions)):
+            self.current_question_index = index
+            question = questions[index]
             self.process_question(
                 topic, question, difficulty_level, current_topic_results
             )
@@ -137,47 +308,47 @@ class KnowledgeTest:
         self, topic, question, difficulty_level, current_topic_results
     ):
         """Process a single question, prompting the user and updating counters."""
-        choice_info = next(
-            item for item in topic["choices"] if item["question_id"] == question["id"]
-        )
+        answer = self.prompt_answer(topic, question, difficulty_level)
+        self.update_counters(answer, question, difficulty_level, current_topic_results)
+
+    def prompt_answer(self, topic, question, difficulty_level):
+        """Show a question record and its choices, and return the answer."""
         print(
             f"{topic['topic']} ({DIFFICULTY_LEVEL_NAMES[difficulty_level]}): {question['question']}\n"
         )
-        for k, choice in enumerate(choice_info["choices"], start=1):
+        for k, choice in enumerate(question["choices"], start=1):
             print(f"{k}. {choice}")
         print("5. I don't know\n6. Proceed to next topic")
 
         answer = click.prompt("\nYour answer", type=int, show_choices=False)
         print("")
-        self.update_counters(
-            answer, choice_info, difficulty_level, current_topic_results
-        )
+        return answer
 
     def update_counters(
-        self, answer, choice_info, difficulty_level, current_topic_results
+        self, answer, question, difficulty_level, current_topic_results
     ):
         """Update consecutive counters based on the user's answer."""
         if answer == 5:
             self.consecutive_incorrect += 1
         elif answer == 6:
             self.reset_consecutive_counters()
-        elif answer - 1 == choice_info["answer"]:
+        elif answer - 1 == question["answer"]:
             self.consecutive_correct += 1
             self.consecutive_incorrect = 0
             current_topic_results["correct_answers"][difficulty_level] += 1
         else:
             self.consecutive_incorrect += 1
             self.consecutive_correct = 0
-        self.update_state()
+        self.record_answer(answer, question, difficulty_level, current_topic_results)
 
     def check_thresholds(self):
         """Check if consecutive correct or incorrect answers have reached their thresholds."""
+        # Counters are reset by update_state_after_level_or_topic, which needs
+        # them to record whether the level was passed.
         if self.consecutive_incorrect >= CONSECUTIVE_FAIL_THRESHOLD:
-            self.reset_consecutive_counters()
             print("(failed)\n")
             return True
         elif self.consecutive_correct == CONSECUTIVE_PASS_THRESHOLD:
-            self.reset_consecutive_counters()
             print("(passed)\n")
             return True
         return False
@@ -189,30 +360,64 @@ class KnowledgeTest:
         if self.consecutive_correct >= CONSECUTIVE_PASS_THRESHOLD:
             current_topic_results["passed_levels"].append(difficulty_level)
         self.reset_consecutive_counters()
+        self.current_question_index = 0  # The next level starts at its first question
+        self.current_level = difficulty_level + 1
         self.update_state()
 
     def reset_consecutive_counters(self):
         """Reset consecutive correct and incorrect counters."""
         self.consecutive_correct, self.consecutive_incorrect = 0, 0
 
-    def update_state(self):
-        """Save the current state of the test to a file."""
+    def record_answer(self, answer, question, difficulty_level, current_topic_results):
+        """Append an answer, with the cursors and counters it leaves behind, to the log."""
+        self.journal.append(
+            {
+                "topic_index": self.current_topic_index,
+                "level": difficulty_level,
+                "question_id": question["id"],
+                "answer": answer,
+                "next_question_index": self.current_question_index + 1,
+                "consecutive_correct": self.consecutive_correct,
+                "consecutive_incorrect": self.consecutive_incorrect,
+                "correct_answers": current_topic_results["correct_answers"][
+                    difficulty_level
+                ],
+            }
+        )
+
+    def update_state(self, clear_log=False):
+        """Save a snapshot of the test's cursors and counters to a file.
+
+        Questions are not saved: the topic keys, the bank hash and the seed
+        are enough to rebuild the exact question order on resume.
+        """
         state = {
+            "mode": self.mode,
+            "settings": self.settings(),
+            "topics": self.topic_keys,
+            "bank_hash": self.bank_hash,
+            "seed": self.seed,
             "results": self.results,
-            "questions": self.loaded_questions,
             "current_topic_index": self.current_topic_index,
+            "current_level": self.current_level,
             "current_question_index": self.current_question_index,
             "consecutive_correct": self.consecutive_correct,
             "consecutive_incorrect": self.consecutive_incorrect,
+            "answers_applied": self.journal.entry_count,
         }
-        with open(self.state_file, "w") as file:
-            yaml.dump(state, file)
+        self.journal.snapshot(state, clear_log=clear_log)
+
+    def settings(self):
+        """Return the options this test was started with, to resume it the same way."""
+        return {}
 
     def show_results(self):
         """Display the test results."""
         print("\nTest Completed. Here are your results:\n")
         for topic, data in self.results.items():
             print(f"Topic: {topic}")
+            if "ability" in data:
+                print(f"Ability: {data['ability']:+.2f} ± {data['standard_error']:.2f}")
             levels_passed = ", ".join(map(str, data["passed_levels"])) or "None"
             print(f"Levels Passed: {levels_passed}")
             for level, correct in data["correct_answers"].items():
@@ -220,18 +425,234 @@ class KnowledgeTest:
             print("\n")
 
 
+class AdaptiveKnowledgeTest(KnowledgeTest):
+    """A knowledge test that picks questions adaptively instead of level by level.
+
+    Each topic runs an AdaptiveSession: every question comes from the level
+    that tells the most about the candidate's current ability estimate, and
+    the topic ends once the estimate is precise enough. The candidate passes
+    every level up to the one their estimated ability has mastered.
+    """
+
+    mode = "cat"
+
+    def __init__(
+        self,
+        topics,
+        test_name,
+        store=None,
+        target_se=CAT_TARGET_SE,
+        max_questions=CAT_MAX_QUESTIONS,
+    ):
+        self.target_se = target_se
+        self.max_questions = max_questions
+        super().__init__(topics, test_name, store)
+
+    def settings(self):
+        return {"target_se": self.target_se, "max_questions": self.max_questions}
+
+    def load_state(self):
+        self.responses = []  # (level, correct) for each answer in the current topic
+        super().load_state()
+
+    def level_rows(self, rows):
+        """Return warehouse levels for every level of the topics placed so far.
+
+        The placement decides all five levels of a topic, whether or not a
+        question of each was asked.
+        """
+        return [
+            {
+                "topic": topic["topic"],
+                "level": level,
+                "passed": level in self.results[topic["topic"]]["passed_levels"],
+            }
+            for topic in self.loaded_questions
+            if "ability" in self.results[topic["topic"]]
+            for level in range(1, 6)
+        ]
+
+    def replay_answer(self, answer):
+        """Restore the current topic's responses from a logged answer."""
+        if answer["topic_index"] != self.current_topic_index:
+            self.responses = []
+        self.current_topic_index = answer["topic_index"]
+        if answer["answer"] == 6:
+            return  # Proceeded to the next topic; not a response
+        self.responses.append((answer["level"], answer["correct"]))
+        topic_name = self.loaded_questions[answer["topic_index"]]["topic"]
+        self.results[topic_name]["correct_answers"][answer["level"]] = answer[
+            "correct_answers"
+        ]
+
+    def process_topic(self, topic_index):
+        """Ask a topic's questions adaptively until its ability estimate is precise enough."""
+        from cat import AdaptiveSession
+
+        self.current_topic_index = topic_index
+        topic = self.loaded_questions[topic_index]
+        current_topic_results = self.results[topic["topic"]]
+        print(f"Topic: {topic['topic']}\n")
+
+        questions = self.level_records[topic_index]
+
+        session = AdaptiveSession(
+            {level: len(qs) for level, qs in questions.items()},
+            target_se=self.target_se,
+            max_questions=self.max_questions,
+        )
+        for level, correct in self.responses:  # Answers given before a resume
+            session.record(level, correct)
+
+        while (level := session.next_level()) is not None:
+            question = questions[level][session.asked[level]]
+            answer = self.prompt_answer(topic, question, level)
+            correct = answer - 1 == question["answer"]
+            if correct:
+                current_topic_results["correct_answers"][level] += 1
+            self.journal.append(
+                {
+                    "topic_index": self.current_topic_index,
+                    "level": level,
+                    "question_id": question["id"],
+                    "answer": answer,
+                    "correct": correct,
+                    "correct_answers": current_topic_results["correct_answers"][level],
+                }
+            )
+            if answer == 6:
+                break  # Logged too, so the log lists every topic that was started
+            session.record(level, correct)
+            self.responses.append((level, correct))
+
+        ability, standard_error = session.estimate()
+        placement = session.placement()
+        current_topic_results["passed_levels"] = list(range(1, placement + 1))
+        current_topic_results["ability"] = round(ability, 3)
+        current_topic_results["standard_error"] = round(standard_error, 3)
+        print(
+            f"(placed at {DIFFICULTY_LEVEL_NAMES[placement] or 'no level'} "
+            f"after {session.question_count} questions)\n"
+        )
+
+        self.responses = []
+        self.current_topic_index += 1
+        self.update_state()
+
+
 @click.group()
-def cli():
+@click.option(
+    "--store",
+    envvar="QUIZ_STORE",
+    help="SQLite database to keep tests in, instead of one state file per test.",
+)
+@click.pass_context
+def cli(ctx, store):
     """Knowledge Test CLI"""
-    pass
+    ctx.obj = None
+    if store:
+        from store import SqliteTestStore
+
+        ctx.obj = SqliteTestStore(store)
 
 
 @cli.command(help="List all available topics.")
 def list_topics():
-    topics = load_questions()
     print("Available Topics:")
-    for topic in topics:
-        print(f"- {topic['topic']}")
+    for entry in load_manifest("./data"):
+        print(f"- {entry['topic']}")
+
+
+@cli.command(help="Pack the JSON question files into a single memory-mapped bank.")
+@click.option("--data-dir", default="./data", help="Directory of JSON question files.")
+@click.option("--output", help="Path of the packed bank file.")
+def pack(data_dir, output):
+    from bank import pack_bank
+
+    path = pack_bank(data_dir, output)
+    print(f"Packed question bank written to {path}")
+
+
+def parse_thresholds(value):
+    """Parse a comma separated list of thresholds."""
+    return [int(threshold) for threshold in value.split(",")]
+
+
+@cli.command(
+    help="Simulate candidates through the pass/fail policy to tune thresholds."
+)
+@click.option(
+    "--candidates",
+    default=1_000_000,
+    type=click.IntRange(min=1),
+    help="Number of simulated candidates.",
+)
+@click.option(
+    "--pass-thresholds",
+    default="3,4,5,6",
+    help="Consecutive correct answers to pass a level, separated by commas.",
+)
+@click.option(
+    "--fail-thresholds",
+    default="2,3,4",
+    help="Consecutive incorrect answers to fail a level, separated by commas.",
+)
+@click.option(
+    "--questions-per-level", default=20, help="Questions available per level."
+)
+@click.option(
+    "--ability-mean", default=0.0, help="Mean candidate ability (levels span -2 to 2)."
+)
+@click.option("--ability-sd", default=1.0, help="Spread of candidate ability.")
+@click.option(
+    "--guess-rate", default=0.25, help="Probability of guessing an answer correctly."
+)
+@click.option(
+    "--mastery",
+    default=0.8,
+    help="Probability of a correct answer at which a level counts as mastered.",
+)
+@click.option("--workers", type=int, help="Number of worker processes.")
+@click.option("--seed", type=int, help="Seed for reproducible simulations.")
+def simulate(
+    candidates,
+    pass_thresholds,
+    fail_thresholds,
+    questions_per_level,
+    ability_mean,
+    ability_sd,
+    guess_rate,
+    mastery,
+    workers,
+    seed,
+):
+    from simulator import simulate_policy
+
+    results = simulate_policy(
+        parse_thresholds(pass_thresholds),
+        parse_thresholds(fail_thresholds),
+        candidates=candidates,
+        questions_per_level=questions_per_level,
+        ability_mean=ability_mean,
+        ability_sd=ability_sd,
+        guess_rate=guess_rate,
+        mastery=mastery,
+        workers=workers,
+        seed=seed,
+    )
+    print(f"Simulated {candidates} candidates per threshold pair:\n")
+    print("Pass  Fail  Misclassified  Mean Questions")
+    for result in results:
+        current = (
+            result["pass_threshold"] == CONSECUTIVE_PASS_THRESHOLD
+            and result["fail_threshold"] == CONSECUTIVE_FAIL_THRESHOLD
+        )
+        print(
+            f"{result['pass_threshold']:>4}  {result['fail_threshold']:>4}"
+            f"  {result['misclassification_rate']:>13.2%}"
+            f"  {result['mean_questions']:>14.2f}"
+            f"{'  (current)' if current else ''}"
+        )
 
 
 @cli.command(help="Start the knowledge test.")
@@ -246,33 +667,244 @@ def list_topics():
     multiple=True,
 )
 @click.option("--name", help="Specify the name for a test")
-def start(exclude, include, name):
+@click.option(
+    "--mode",
+    type=click.Choice(["levels", "cat"]),
+    default="levels",
+    help="Ask every level in turn, or pick questions adaptively (cat).",
+)
+@click.option(
+    "--target-se",
+    default=CAT_TARGET_SE,
+    help="In cat mode, end a topic once the ability estimate's standard error is this low.",
+)
+@click.option(
+    "--max-questions",
+    default=CAT_MAX_QUESTIONS,
+    help="In cat mode, the most questions to ask per topic.",
+)
+@click.pass_obj
+def start(store, exclude, include, name, mode, target_se, max_questions):
     excluded_topics = (
         {topic.strip() for t in exclude for topic in t.split(",")} if exclude else None
     )
     included_topics = (
         {topic.strip() for t in include for topic in t.split(",")} if include else None
     )
+    if name is not None:
+        # A test that was already started with this name carries on where it
+        # left off, on its own topics, as with resume
+        state = KnowledgeTest.saved_state(name, store)
+        if state is not None:
+            print(f"Resuming the saved test '{name}'.")
+            resume_test(name, store, state)
+            return
+
     topics_data = load_questions(excluded_topics, included_topics)
     if not topics_data:
         print("No topics found with the specified criteria.")
         return
 
     test_name = name if name else generate_test_name()
-    test = KnowledgeTest(topics_data, test_name)
+    if mode == "cat":
+        test = AdaptiveKnowledgeTest(
+            topics_data, test_name, store, target_se, max_questions
+        )
+    else:
+        test = KnowledgeTest(topics_data, test_name, store)
     test.run_test()
 
 
 @cli.command(help="Resume a test by test name.")
 @click.option("--name", help="Specify the name for a test", required=True)
-def resume(name):
-    if os.path.exists(f"{name}_state.yaml"):
-        topics_data = load_questions()  # Load all topics to ensure correct resumption
-        test = KnowledgeTest(topics_data, name)
-        test.run_test()
+@click.pass_obj
+def resume(store, name):
+    state = KnowledgeTest.saved_state(name, store)
+    if state is not None:
+        resume_test(name, store, state)
     else:
         print(f"No saved test with the name '{name}' found.")
 
 
+def resume_test(name, store, state):
+    """Run a saved test on the topics named in its state."""
+    topic_keys = KnowledgeTest.saved_topic_keys(state)
+    topics_data = load_questions(included_topics=set(topic_keys))
+    if state.get("mode") == "cat":
+        test = AdaptiveKnowledgeTest(topics_data, name, store, **state["settings"])
+    else:
+        test = KnowledgeTest(topics_data, name, store)
+    test.run_test()
+
+
+@cli.command(help="List saved tests, most recently updated first.")
+@click.option("--limit", type=int, help="Maximum number of tests to list.")
+@click.pass_obj
+def list_tests(store, limit):
+    if store is None:
+        files = sorted(Path(".").glob("*_state.yaml"), key=lambda f: -f.stat().st_mtime)
+        names = [f.name[: -len("_state.yaml")] for f in files][:limit]
+        print("Saved Tests:")
+        for name in names:
+            print(f"- {name}")
+        return
+
+    print("Saved Tests:")
+    for name, updated_at, completed_at in store.list_tests(limit):
+        status = "completed" if completed_at else "in progress"
+        updated = datetime.fromtimestamp(updated_at).strftime("%Y-%m-%d %H:%M")
+        print(f"- {name} ({status}, updated {updated})")
+
+
+@cli.command(help="Import saved test state files into the SQLite store.")
+@click.argument("files", nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.pass_obj
+def import_state(store, files):
+    if store is None:
+        raise click.UsageError("import-state requires --store.")
+    for file in files:
+        name = store.import_state_file(file)
+        print(f"Imported '{name}' from {file}")
+
+
+@cli.command(help="Show the share of completed tests that passed each topic and level.")
+@click.option(
+    "--topic",
+    "topics",
+    multiple=True,
+    help="Only show these topics (by name), can be repeated.",
+)
+@click.option(
+    "--source",
+    type=click.Choice(["cli", "app"]),
+    help="Only count tests taken with the CLI or the web app.",
+)
+def pass_rates(topics, source):
+    from warehouse import pass_rates as query_pass_rates
+
+    rates = query_pass_rates(topics=topics, source=source)
+    if rates.empty:
+        print("No completed tests found.")
+        return
+    print("Topic                           Level          Tests  Pass Rate")
+    for (topic, level), sessions, _, pass_rate in rates.itertuples():
+        print(
+            f"{topic:<32}{DIFFICULTY_LEVEL_NAMES[level]:<13}"
+            f"{sessions:>7}  {pass_rate:>9.0%}"
+        )
+
+
+@cli.command(
+    help="Grade NDJSON or CSV answer sheets (rows of test, seed, question_id and "
+    "answer) exactly as the interactive test would, streaming results as NDJSON."
+)
+@click.argument(
+    "sheets", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="File to write results to (default: standard output).",
+)
+@click.option(
+    "--mode",
+    type=click.Choice(["levels", "cat"]),
+    default="levels",
+    help="The mode the sheets' tests were taken in.",
+)
+@click.option("--target-se", default=CAT_TARGET_SE, help="As for start --mode cat.")
+@click.option(
+    "--max-questions", default=CAT_MAX_QUESTIONS, help="As for start --mode cat."
+)
+@click.option("--workers", type=int, help="Number of worker processes.")
+def grade(sheets, output, mode, target_se, max_questions, workers):
+    from grading import SheetError, grade_sheets
+
+    settings = {"target_se": target_se, "max_questions": max_questions}
+    try:
+        for result in grade_sheets(sheets, mode, settings, workers):
+            output.write(json.dumps(result) + "\n")
+    except SheetError as e:
+        raise click.ClickException(str(e))
+
+
+@cli.command(help="Search the question bank for questions containing every word.")
+@click.argument("query", nargs=-1, required=True)
+@click.option(
+    "--topic",
+    "topics",
+    multiple=True,
+    help="Only search these topics (by name), can be repeated.",
+)
+@click.option("--limit", default=20, help="Maximum number of questions to show.")
+@click.option("--data-dir", default="./data", help="Directory of JSON question files.")
+def search(query, topics, limit, data_dir):
+    from search import open_index
+
+    with open_index(data_dir) as index:
+        documents, _ = index.search(" ".join(query), limit, topics or None)
+        if not len(documents):
+            print("No matching questions found.")
+        for document in documents:
+            question = index.document(document)
+            print(
+                f"[{question['topic']} / {question['level'].capitalize()}] "
+                f"{question['id']}: {question['question']}"
+            )
+
+
+@cli.command(
+    help="Find near-duplicate questions (by question text and choices) across "
+    "the bank, and optionally write a bank without them."
+)
+@click.option("--data-dir", default="data", help="Directory of question files.")
+@click.option(
+    "--threshold",
+    default=0.7,
+    help="Minimum estimated Jaccard similarity of two questions' text shingles.",
+)
+@click.option(
+    "--output",
+    type=click.Path(file_okay=False),
+    help="Write the bank to this directory, keeping the first question of "
+    "each cluster.",
+)
+def dedupe(data_dir, threshold, output):
+    from dedupe import (
+        bank_questions,
+        find_duplicates,
+        question_text,
+        read_bank,
+        write_deduplicated_bank,
+    )
+
+    bank = read_bank(data_dir)
+    questions = bank_questions(bank)
+    clusters = find_duplicates(
+        [
+            question_text(question, choice_info)
+            for _, question, choice_info in questions
+        ],
+        threshold,
+    )
+    for number, cluster in enumerate(clusters, 1):
+        print(f"Cluster {number}:")
+        for index in cluster:
+            topic, question, _ = questions[index]
+            print(f"  [{topic['topic']}] {question['id']}: {question['question']}")
+
+    duplicate_ids = {
+        questions[index][1]["id"] for cluster in clusters for index in cluster[1:]
+    }
+    print(
+        f"{len(clusters)} clusters, {len(duplicate_ids)} duplicate questions "
+        f"out of {len(questions)}"
+    )
+    if output:
+        write_deduplicated_bank(bank, duplicate_ids, output)
+        print(f"Wrote the deduplicated bank to {output}")
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,149 @@
+import json
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+SHINGLE_SIZE = 5  # Characters
+NUM_PERM = 128
+BANDS = 16  # Of NUM_PERM // BANDS rows; pairs above ~0.7 Jaccard usually collide
+BATCH_SHINGLES = 50_000  # Shingle hashes per batch when computing signatures
+
+
+def question_text(question, choice_info):
+    """Return the normalized text a question is compared on: itself and its choices."""
+    choices = sorted(choice_info["choices"]) if choice_info else []
+    text = " ".join([question["question"], *choices]).lower()
+    return " ".join(re.findall(r"\w+", text))
+
+
+def shingle_hashes(text):
+    """Return the 32-bit hashes of a text's distinct character shingles."""
+    if len(text) <= SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {
+            text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)
+        }
+    return np.fromiter(
+        (zlib.crc32(shingle.encode()) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=0):
+    """Return a (len(texts), num_perm) array of MinHash signatures.
+
+    Uses num_perm multiply-shift hash functions, ((a * x + b) mod 2**64) >> 32,
+    applied to every shingle hash at once, batch by batch; each signature is
+    the minimum per hash function over the text's shingles.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**63, num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 2**63, num_perm, dtype=np.uint64)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+
+    start = 0
+    while start < len(texts):
+        hashes, offsets, stop, total = [], [], start, 0
+        while stop < len(texts) and (total < BATCH_SHINGLES or stop == start):
+            text_hashes = shingle_hashes(texts[stop])
+            offsets.append(total)
+            hashes.append(text_hashes)
+            total += len(text_hashes)
+            stop += 1
+        values = (np.concatenate(hashes)[:, None] * a + b) >> np.uint64(32)
+        signatures[start:stop] = np.minimum.reduceat(values, offsets, axis=0)
+        start = stop
+    return signatures
+
+
+def candidate_pairs(signatures, bands=BANDS):
+    """Yield (i, j) pairs whose signatures agree on every row of some band.
+
+    Each band's rows are grouped with a sort rather than compared pairwise.
+    Every member of a bucket is paired with the bucket's first member only,
+    so the number of pairs stays linear in the number of texts.
+    """
+    rows = signatures.shape[1] // bands
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[:, band * rows : (band + 1) * rows])
+        keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+        for start, end in zip(starts, ends):
+            for other in order[start + 1 : end]:
+                yield int(order[start]), int(other)
+
+
+def find_duplicates(texts, threshold=0.7, bands=BANDS):
+    """Group near-duplicate texts into clusters.
+
+    Candidate pairs from LSH banding are kept when their estimated Jaccard
+    similarity (the share of equal signature entries) is at least threshold,
+    and joined into clusters with union-find. Returns clusters of text indexes, each sorted,
+    largest clusters first; texts without duplicates are left out.
+    """
+    signatures = minhash_signatures(texts)
+    parents = list(range(len(texts)))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    checked = set()
+    for i, j in candidate_pairs(signatures, bands):
+        if (i, j) in checked:
+            continue
+        checked.add((i, j))
+        if np.mean(signatures[i] == signatures[j]) >= threshold:
+            parents[find(j)] = find(i)
+
+    clusters = {}
+    for i in range(len(texts)):
+        clusters.setdefault(find(i), []).append(i)
+    return sorted(
+        (sorted(cluster) for cluster in clusters.values() if len(cluster) > 1),
+        key=lambda cluster: (-len(cluster), cluster[0]),
+    )
+
+
+def read_bank(data_dir="data"):
+    """Return the question files in data_dir as (path, topic data) in name order."""
+    bank = []
+    for file in sorted(Path(data_dir).glob("*.json")):
+        with open(file, "r") as f:
+            bank.append((file, json.load(f)))
+    return bank
+
+
+def bank_questions(bank):
+    """Return (topic, question, choice_info) for every question of a bank."""
+    questions = []
+    for _, topic in bank:
+        choices_by_id = {item["question_id"]: item for item in topic["choices"]}
+        for question in topic["questions"]:
+            questions.append((topic, question, choices_by_id.get(question["id"])))
+    return questions
+
+
+def write_deduplicated_bank(bank, duplicate_ids, output_dir):
+    """Write the bank to output_dir without the questions whose ids are given."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for path, topic in bank:
+        kept = dict(
+            topic,
+            questions=[q for q in topic["questions"] if q["id"] not in duplicate_ids],
+            choices=[
+                c for c in topic["choices"] if c["question_id"] not in duplicate_ids
+            ],
+        )
+        with open(output_dir / path.name, "w") as f:
+            json.dump(kept, f, indent=2)
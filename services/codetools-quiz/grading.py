@@ -0,0 +1,249 @@
+import csv
+import io
+import json
+import os
+from contextlib import redirect_stdout
+from itertools import groupby
+from multiprocessing import Pool
+from random import Random
+
+from cli import AdaptiveKnowledgeTest, KnowledgeTest, load_questions
+from manifest import to_snake_case
+
+SHEET_FIELDS = ["test", "seed", "question_id", "answer"]
+PROCEED_TO_NEXT_TOPIC = 6
+
+
+class NullJournal:
+    """A journal that keeps nothing, for tests that are graded rather than taken."""
+
+    entry_count = 0
+
+    def exists(self):
+        return False
+
+    def load(self):
+        return None, []
+
+    def append(self, entry):
+        pass
+
+    def needs_compaction(self):
+        return False
+
+    def snapshot(self, state, clear_log=True):
+        pass
+
+    def flush(self):
+        pass
+
+
+class SheetAnswers:
+    """Answers a knowledge test's questions from an answer sheet.
+
+    Mixed into KnowledgeTest or AdaptiveKnowledgeTest, so a sheet goes through
+    exactly the same question order, counters, thresholds and passed_levels
+    logic as a test taken interactively with the same seed. A question that is
+    not on the sheet is answered with "Proceed to next topic".
+    """
+
+    def __init__(self, topics, sheet, **settings):
+        self.sheet = sheet
+        super().__init__(topics, sheet["test"], **settings)
+
+    @staticmethod
+    def open_journal(test_name, store=None):
+        return NullJournal()
+
+    def topics_hash(self, topic_keys):
+        return None  # Not saved anywhere
+
+    def load_state(self):
+        super().load_state()
+        self.seed = self.sheet["seed"]
+
+    def join_level_records(self, topic):
+        # The join doesn't depend on the seed, so each worker does it once per topic
+        joined = JOINED_RECORDS.get(topic["topic"])
+        if joined is None:
+            joined = JOINED_RECORDS[topic["topic"]] = unshuffled_level_records(topic)
+        key = to_snake_case(topic["topic"])
+        level_records = {}
+        for level, records in joined.items():
+            records = list(records)
+            Random(f"{self.seed}:{key}:{level}").shuffle(records)
+            level_records[level] = [record for record in records if record is not None]
+        return level_records
+
+    def prompt_answer(self, topic, question, difficulty_level):
+        return self.sheet["answers"].get(question["id"], PROCEED_TO_NEXT_TOPIC)
+
+    def save_results(self):
+        pass  # Graded results are streamed to the caller instead
+
+
+class SheetKnowledgeTest(SheetAnswers, KnowledgeTest):
+    pass
+
+
+class SheetAdaptiveKnowledgeTest(SheetAnswers, AdaptiveKnowledgeTest):
+    pass
+
+
+def unshuffled_level_records(topic):
+    """Join a topic's questions to their choices per level, in bank order.
+
+    Questions without choices are kept as None so that shuffling these lists
+    permutes them exactly as KnowledgeTest.join_level_records shuffles the
+    topic's questions.
+    """
+    choices_by_id = {item["question_id"]: item for item in topic["choices"]}
+    level_records = {level: [] for level in range(1, 6)}
+    for question in topic["questions"]:
+        if question["difficulty"] not in level_records:
+            continue
+        choice_info = choices_by_id.get(question["id"])
+        level_records[question["difficulty"]].append(
+            choice_info
+            and {
+                "id": question["id"],
+                "question": question["question"],
+                "choices": choice_info["choices"],
+                "answer": choice_info["answer"],
+            }
+        )
+    return level_records
+
+
+class SheetError(ValueError):
+    """An answer sheet file that cannot be graded."""
+
+
+def read_rows(path):
+    """Yield the answer rows of an NDJSON or CSV sheet file, checking each one.
+
+    Raises SheetError, naming the file and line, for a CSV header or a row
+    that lacks any of SHEET_FIELDS or whose seed or answer is not a number.
+    """
+    with open(path, "r", newline="") as f:
+        if path.endswith(".csv"):
+            reader = csv.DictReader(f)
+            missing = [
+                field
+                for field in SHEET_FIELDS
+                if field not in (reader.fieldnames or [])
+            ]
+            if missing:
+                raise SheetError(
+                    f"{path}, line 1: missing column(s) {', '.join(missing)}"
+                )
+            rows = ((reader.line_num, row) for row in reader)
+        else:
+            rows = (
+                (line_number, line)
+                for line_number, line in enumerate(f, start=1)
+                if line.strip()
+            )
+        for line_number, row in rows:
+            try:
+                if isinstance(row, str):
+                    row = json.loads(row)
+                missing = [field for field in SHEET_FIELDS if row.get(field) is None]
+                if missing:
+                    raise SheetError(f"missing field(s) {', '.join(missing)}")
+                row["seed"], row["answer"] = int(row["seed"]), int(row["answer"])
+            except (AttributeError, ValueError, TypeError) as e:
+                raise SheetError(f"{path}, line {line_number}: {e}") from None
+            yield row
+
+
+def check_sheets(paths):
+    """Check the header (or first row) of every sheet file before any is graded."""
+    for path in paths:
+        next(read_rows(path), None)
+
+
+def read_sheets(paths):
+    """Yield answer sheets from NDJSON or CSV files of answer rows.
+
+    Each row has the test name, the seed the test was taken with, a question
+    id and the answer given (1-4 for a choice, 5 for "I don't know", 6 to
+    proceed to the next topic). Consecutive rows of the same test form one
+    sheet: {"test", "seed", "answers": {question_id: answer}}.
+    """
+    for path in paths:
+        for test, test_rows in groupby(read_rows(path), key=lambda row: row["test"]):
+            answers, seed = {}, None
+            for row in test_rows:
+                seed = row["seed"]
+                answers[row["question_id"]] = row["answer"]
+            yield {"test": test, "seed": seed, "answers": answers}
+
+
+# Per-worker state, set up once by init_worker
+TOPICS = []
+TOPICS_BY_QUESTION = {}
+JOINED_RECORDS = {}
+SETTINGS = {}
+
+
+def init_worker(mode, settings):
+    """Load the question bank once per worker process."""
+    TOPICS[:] = load_questions()
+    TOPICS_BY_QUESTION.clear()
+    for topic_index, topic in enumerate(TOPICS):
+        for question in topic["questions"]:
+            TOPICS_BY_QUESTION[question["id"]] = topic_index
+    SETTINGS.update(settings, mode=mode)
+
+
+def grade_sheet(sheet):
+    """Grade one answer sheet; returns {"test", "results"} like KnowledgeTest.results.
+
+    The test covers the topics the sheet answers, in bank order, as a test
+    started with --include for those topics would.
+    """
+    topic_indexes = sorted(
+        {
+            TOPICS_BY_QUESTION[question_id]
+            for question_id in sheet["answers"]
+            if question_id in TOPICS_BY_QUESTION
+        }
+    )
+    topics = [TOPICS[index] for index in topic_indexes]
+    settings = dict(SETTINGS)
+    if settings.pop("mode") == "cat":
+        test = SheetAdaptiveKnowledgeTest(topics, sheet, **settings)
+    else:
+        test = SheetKnowledgeTest(topics, sheet)
+    with redirect_stdout(io.StringIO()):
+        test.run_test()
+    return {"test": sheet["test"], "results": test.results}
+
+
+def grade_sheets(paths, mode="levels", settings=None, workers=None, chunksize=64):
+    """Grade answer sheets across a pool of worker processes.
+
+    Sheets are read lazily and results are yielded in input order as soon as
+    they are ready, so any number of sheets can be streamed through. Every
+    file's header is checked before any work starts. A bad row further on
+    stops the sheets there, and its SheetError is raised to the caller once
+    the sheets before it are graded, rather than inside the pool.
+    """
+    check_sheets(paths)
+    errors = []
+
+    def sheets():
+        try:
+            yield from read_sheets(paths)
+        except SheetError as e:  # In the pool's task thread, where it would be lost
+            errors.append(e)
+
+    with Pool(
+        workers or os.cpu_count(),
+        initializer=init_worker,
+        initargs=(mode, settings or {}),
+    ) as pool:
+        yield from pool.imap(grade_sheet, sheets(), chunksize=chunksize)
+    if errors:
+        raise errors[0]
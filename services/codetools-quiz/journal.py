@@ -0,0 +1,164 @@
+import copy
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import yaml
+
+# libyaml's C implementation is an order of magnitude faster when available
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to unlocked, but still atomic, writes
+    fcntl = None
+
+
+class Journal:
+    """A YAML snapshot plus an append-only log of the entries recorded since.
+
+    Appending writes a single JSON line, so its cost does not depend on the
+    size of the snapshot. Entries must be idempotent (record absolute values
+    rather than increments): if a crash happens after a snapshot is written but
+    before the log is cleared, the stale entries are replayed onto a snapshot
+    that already contains them.
+
+    Snapshots are written to a temporary file and renamed into place, and all
+    reads and writes hold an exclusive lock on a sibling .lock file, so
+    several processes can share a journal without corrupting it.
+
+    Given a WriteBehind writer, appends and snapshots are buffered in memory
+    and written by the writer's thread; call flush() to write them right away.
+    """
+
+    def __init__(self, snapshot_path, compact_every=50, writer=None):
+        self.snapshot_path = Path(snapshot_path)
+        self.log_path = self.snapshot_path.with_suffix(".journal")
+        self.lock_path = self.snapshot_path.with_suffix(".lock")
+        self.compact_every = compact_every
+        self.writer = writer
+        self.entry_count = 0
+        self.pending_lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending_snapshot = None
+        self.pending_lines = []
+
+    @contextmanager
+    def locked(self):
+        """Hold the journal's lock for the duration of the block."""
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def exists(self):
+        return self.pending_snapshot is not None or self.snapshot_path.exists()
+
+    def load(self):
+        """Return the latest snapshot (or None) and the entries logged after it."""
+        self.flush()
+        with self.locked():
+            snapshot = None
+            if self.snapshot_path.exists():
+                with open(self.snapshot_path, "r") as file:
+                    snapshot = yaml.load(file, Loader=SafeLoader)
+
+            entries = []
+            if self.log_path.exists():
+                with open(self.log_path, "r+b") as file:
+                    valid_size = 0
+                    for line in file:
+                        # A torn append can still parse, so only a line that
+                        # ends in a newline is complete
+                        if not line.endswith(b"\n"):
+                            break
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            break
+                        valid_size += len(line)
+                    # Drop a torn final line from an interrupted append so the
+                    # next append starts on a fresh line.
+                    file.truncate(valid_size)
+        self.entry_count = len(entries)
+        return snapshot, entries
+
+    def append(self, entry):
+        """Append an entry to the log."""
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        self.entry_count += 1
+        if self.writer is None:
+            self.write(None, [line])
+            return
+        with self.pending_lock:
+            self.pending_lines.append(line)
+        self.writer.schedule(self)
+
+    def needs_compaction(self):
+        return self.compact_every is not None and self.entry_count >= self.compact_every
+
+    def snapshot(self, state, clear_log=True):
+        """Write a full snapshot of state and clear the log it supersedes.
+
+        With clear_log=False the log is kept as a full history; the snapshot
+        must then record how many entries it already includes.
+        """
+        if clear_log:
+            self.entry_count = 0
+        if self.writer is None:
+            self.write((state, clear_log), [])
+            return
+        state = copy.deepcopy(state)  # The caller keeps mutating its state
+        with self.pending_lock:
+            # A superseded snapshot that cleared the log still has to clear it
+            # before the entries appended since are written.
+            previous_clears = (
+                self.pending_snapshot is not None and self.pending_snapshot[1]
+            )
+            if clear_log:
+                self.pending_lines.clear()  # Already folded into the snapshot
+            self.pending_snapshot = (state, clear_log or previous_clears)
+        self.writer.schedule(self)
+
+    def flush(self):
+        """Write any buffered snapshot and entries."""
+        with self.flush_lock:
+            with self.pending_lock:
+                snapshot, lines = self.pending_snapshot, self.pending_lines
+                self.pending_snapshot, self.pending_lines = None, []
+            if snapshot is not None or lines:
+                self.write(snapshot, lines)
+
+    def write(self, snapshot, lines):
+        """Write an optional (state, clear_log) snapshot, then append log lines."""
+        with self.locked():
+            if snapshot is not None:
+                state, clear_log = snapshot
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=self.snapshot_path.parent,
+                    prefix=f".{self.snapshot_path.name}.",
+                )
+                try:
+                    with os.fdopen(fd, "w") as file:
+                        yaml.dump(state, file, Dumper=SafeDumper)
+                        file.flush()
+                        os.fsync(file.fileno())
+                    os.replace(tmp_path, self.snapshot_path)
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+                if clear_log:
+                    with open(self.log_path, "w"):
+                        pass
+            if lines:
+                with open(self.log_path, "a") as file:
+                    file.write("".join(lines))
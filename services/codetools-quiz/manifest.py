@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+MANIFEST_FILE = "topics.manifest"
+MANIFEST_VERSION = 1
+
+
+def to_snake_case(s):
+    """Convert a string to snake case, replacing spaces and dashes."""
+    s = s.replace(" ", "_").replace("-", "_")
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", s).lower()
+
+
+def hash_file(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_entry(path, content_hash, stat):
+    """Parse a question file and summarize it as a manifest entry."""
+    with open(path, "r") as f:
+        topic_data = json.load(f)
+    topic = topic_data.get("topic", "")
+    counts = Counter(q["difficulty"] for q in topic_data.get("questions", []))
+    return {
+        "topic": topic,
+        "key": to_snake_case(topic),
+        "path": path.name,
+        "counts": {str(level): counts[level] for level in sorted(counts)},
+        "sha256": content_hash,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+
+
+def read_manifest(path):
+    """Read the manifest entries keyed by file name, or {} if unusable."""
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return {entry["path"]: entry for entry in manifest.get("topics", [])}
+
+
+def write_manifest(path, entries):
+    """Atomically write the manifest entries."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "topics": entries}, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_manifest(data_dir="data"):
+    """Return one entry per question file in data_dir, refreshing stale entries.
+
+    Files whose modification time and size match the manifest are not read.
+    Otherwise the file is hashed, and only parsed again if its hash changed.
+    The manifest is rewritten whenever an entry was added, changed or removed.
+    """
+    data_dir = Path(data_dir)
+    manifest_path = data_dir / MANIFEST_FILE
+    cached = read_manifest(manifest_path)
+    entries = []
+    changed = False
+
+    for file in sorted(data_dir.glob("*.json")):
+        stat = file.stat()
+        entry = cached.get(file.name)
+        if (
+            entry is not None
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            entries.append(entry)
+            continue
+
+        content_hash = hash_file(file)
+        if entry is not None and entry["sha256"] == content_hash:
+            entry = {**entry, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+        else:
+            entry = build_entry(file, content_hash, stat)
+        entries.append(entry)
+        changed = True
+
+    if changed or len(entries) != len(cached):
+        try:
+            write_manifest(manifest_path, entries)
+        except OSError:
+            pass  # A read-only data directory still gets a correct manifest
+    return entries
+
+
+def bank_hash(entries):
+    """Return a content hash covering every question file in the manifest."""
+    digest = hashlib.sha256()
+    for entry in sorted(entries, key=lambda e: e["path"]):
+        digest.update(entry["path"].encode("utf-8"))
+        digest.update(entry["sha256"].encode("ascii"))
+    return digest.hexdigest()
@@ -0,0 +1,109 @@
+import atexit
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehind:
+    """Background thread that flushes dirty objects off the request path.
+
+    Objects are scheduled with schedule(); each must have a flush() method
+    that writes whatever changed since its last flush. A burst of changes is
+    coalesced into a single flush once no new change has arrived for `window`
+    seconds, but no change waits longer than `max_delay` seconds, which bounds
+    what can be lost if the process dies. Everything still pending is flushed
+    when the interpreter exits.
+    """
+
+    def __init__(self, window=0.5, max_delay=2.0):
+        self.window = window
+        self.max_delay = max_delay
+        self.condition = threading.Condition()
+        self.pending = {}  # id(obj) -> obj, in scheduling order
+        self.first_scheduled_at = None
+        self.last_scheduled_at = None
+        self.in_flight = 0  # Objects the background thread is flushing right now
+        self.thread = None
+        atexit.register(self.flush)
+
+    def schedule(self, obj):
+        """Mark an object as having changes to flush."""
+        with self.condition:
+            now = time.monotonic()
+            self.pending[id(obj)] = obj
+            if self.first_scheduled_at is None:
+                self.first_scheduled_at = now
+            self.last_scheduled_at = now
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name="write-behind", daemon=True
+                )
+                self.thread.start()
+            self.condition.notify()
+
+    def take_pending(self):
+        """Remove and return everything scheduled so far; caller holds the condition."""
+        objs = list(self.pending.values())
+        self.pending.clear()
+        self.first_scheduled_at = self.last_scheduled_at = None
+        return objs
+
+    def flush(self):
+        """Flush everything that is pending, in the calling thread.
+
+        First waits for the background thread to finish the flushes it has
+        in progress, so that everything scheduled before the call is on disk
+        when it returns, even at exit, where the thread is killed.
+        """
+        with self.condition:
+            while self.in_flight:
+                self.condition.wait()
+            objs = self.take_pending()
+        for obj in objs:
+            obj.flush()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                while True:
+                    now = time.monotonic()
+                    due = min(
+                        self.last_scheduled_at + self.window,
+                        self.first_scheduled_at + self.max_delay,
+                    )
+                    if now >= due:
+                        break
+                    self.condition.wait(due - now)
+                    if not self.pending:  # Flushed by another thread meanwhile
+                        break
+                objs = self.take_pending()
+                self.in_flight = len(objs)
+            for obj in objs:
+                try:
+                    obj.flush()
+                except Exception:
+                    logger.exception("Failed to write %s", obj)
+                finally:
+                    with self.condition:
+                        self.in_flight -= 1
+                        if not self.in_flight:
+                            self.condition.notify_all()
+
+
+_writer = None
+
+
+def get_writer():
+    """Return the process-wide writer, configured from QUIZ_WRITE_WINDOW/QUIZ_WRITE_MAX_DELAY."""
+    global _writer
+    if _writer is None:
+        _writer = WriteBehind(
+            window=float(os.environ.get("QUIZ_WRITE_WINDOW", 0.5)),
+            max_delay=float(os.environ.get("QUIZ_WRITE_MAX_DELAY", 2.0)),
+        )
+    return _writer
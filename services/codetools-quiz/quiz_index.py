@@ -0,0 +1,54 @@
+class QuizIndex:
+    """Where each topic and (topic, level) sits in a quiz, and how much of it is answered.
+
+    Quizzes keep each topic's questions, and each level's questions within
+    the topic, next to each other, so every group is a contiguous range of
+    question indexes. Answered counts are kept per group and updated one
+    answer at a time, so progress and navigation lookups don't scan the quiz.
+    """
+
+    def __init__(self, questions):
+        self.topics = []
+        self.topic_positions = {}
+        self.topic_ranges = {}
+        self.level_ranges = {}
+        self.answered = {}
+        self.question_count = len(questions)
+        for index, question in enumerate(questions):
+            topic, key = question["topic"], (question["topic"], question["level"])
+            if topic not in self.topic_ranges:
+                self.topic_positions[topic] = len(self.topics)
+                self.topics.append(topic)
+                self.topic_ranges[topic] = [index, index]
+                self.answered[topic] = 0
+            if key not in self.level_ranges:
+                self.level_ranges[key] = [index, index]
+                self.answered[key] = 0
+            for ranges, group in ((self.topic_ranges, topic), (self.level_ranges, key)):
+                if ranges[group][1] != index:
+                    raise ValueError(f"Questions for {group} are not contiguous")
+                ranges[group][1] = index + 1
+            if question["selected_answer"] is not None:
+                self.answered[topic] += 1
+                self.answered[key] += 1
+
+    def select_answer(self, question, answer):
+        """Account for answer replacing the question's current selection."""
+        was_answered = question["selected_answer"] is not None
+        is_answered = answer is not None
+        if was_answered != is_answered:
+            change = 1 if is_answered else -1
+            self.answered[question["topic"]] += change
+            self.answered[(question["topic"], question["level"])] += change
+
+    def progress(self, topic, level=None):
+        """Return the fraction of a topic's, or one of its levels', questions answered."""
+        group = topic if level is None else (topic, level)
+        ranges = self.topic_ranges if level is None else self.level_ranges
+        start, stop = ranges[group]
+        return self.answered[group] / (stop - start)
+
+    def next_topic_start(self, topic):
+        """Return the index of the first question after topic, or None if it is last."""
+        stop = self.topic_ranges[topic][1]
+        return stop if stop < self.question_count else None
@@ -0,0 +1,52 @@
+from config import SKILL_LEVELS
+
+
+def is_passing(score):
+    """Check whether more than half of a level's questions were answered correctly."""
+    return score["correct"] / score["total"] > 0.5
+
+
+class ScoreAggregator:
+    """Running scores for a quiz, kept up to date one answer at a time.
+
+    Holds correct/total counts per (topic, level) in the same shape as a full
+    recount over the quiz, plus the highest passed level per topic (0 when no
+    level was passed).
+    """
+
+    def __init__(self, questions):
+        self.scores = {}
+        self.highest_levels = {}
+        for question in questions:
+            key = (question["topic"], question["level"])
+            if key not in self.scores:
+                self.scores[key] = {"correct": 0, "total": 0}
+            self.scores[key]["total"] += 1
+            if question["selected_answer"] == question["correct_answer"]:
+                self.scores[key]["correct"] += 1
+            self.highest_levels.setdefault(question["topic"], 0)
+        for topic in self.highest_levels:
+            self.update_highest_level(topic)
+
+    def select_answer(self, question, answer):
+        """Account for answer replacing the question's current selection."""
+        key = (question["topic"], question["level"])
+        was_correct = question["selected_answer"] == question["correct_answer"]
+        is_correct = answer == question["correct_answer"]
+        if was_correct != is_correct:
+            self.scores[key]["correct"] += 1 if is_correct else -1
+            self.update_highest_level(question["topic"])
+
+    def update_highest_level(self, topic):
+        """Recompute a topic's highest passed level from its per-level scores."""
+        highest_level = 0
+        for level_value, level in enumerate(SKILL_LEVELS, start=1):
+            score = self.scores.get((topic, level))
+            if score is not None and is_passing(score):
+                highest_level = level_value
+        self.highest_levels[topic] = highest_level
+
+    def has_passed(self, topic, level):
+        """Check whether a level is currently passed; unknown levels are not."""
+        score = self.scores.get((topic, level))
+        return score is not None and is_passing(score)
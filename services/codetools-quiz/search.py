@@ -0,0 +1,361 @@
+import mmap
+import os
+import re
+import struct
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from bank import StringPool, read_topic_files
+from config import SKILL_LEVELS
+from manifest import bank_hash, load_manifest
+
+# Inverted index file layout (all integers little-endian):
+#
+#   header    magic, version, counts, the content hash of the question files
+#             it was built from (manifest.bank_hash) and the offset of every
+#             section below
+#   topics    one record per topic: name (pool offset/length)
+#   documents one record per question, in the order of bank.compile_bank:
+#             id and text (pool offset/length), topic, difficulty and the
+#             number of tokens in the text
+#   terms     one record per distinct token, sorted by token: token (pool
+#             offset/length) and the start of its postings; a final sentinel
+#             record holds the total number of postings
+#   postings  document numbers, ascending within each term, followed by the
+#             matching term frequencies
+#   pool      UTF-8 string pool; identical strings are stored once
+#
+# Like the packed bank, the file is memory-mapped and only the terms of a
+# query are looked up, so a query costs the same whatever the vocabulary size.
+
+INDEX_FILE = "questions.index"
+INDEX_MAGIC = b"CTQX"
+INDEX_VERSION = 1
+
+HEADER = struct.Struct("<4sHH32sIIIIIIIII")
+TOPIC_RECORD = struct.Struct("<II")
+DOCUMENT_DTYPE = np.dtype(
+    [
+        ("id_offset", "<u4"),
+        ("id_length", "<u4"),
+        ("text_offset", "<u4"),
+        ("text_length", "<u4"),
+        ("topic", "<u2"),
+        ("difficulty", "u1"),
+        ("token_count", "u1"),
+    ]
+)
+TERM_DTYPE = np.dtype([("offset", "<u4"), ("length", "<u4"), ("first_posting", "<u4")])
+
+# Okapi BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    """Split text into lowercase word tokens."""
+    return re.findall(r"\w+", text.lower())
+
+
+def compile_index(topics):
+    """Tokenize every question's text and invert it into term postings.
+
+    Returns the topic, document and term records of the index layout, the
+    postings' document numbers and term frequencies, and the string pool.
+    """
+    pool = StringPool()
+    topic_records, documents = [], []
+    term_ids = {}
+    posting_terms, posting_documents, posting_frequencies = [], [], []
+
+    for topic_id, topic_data in enumerate(topics):
+        topic_records.append(pool.add(topic_data.get("topic", "")))
+        for question in topic_data.get("questions", []):
+            tokens = tokenize(question["question"])
+            document = len(documents)
+            for token, frequency in Counter(tokens).items():
+                posting_terms.append(term_ids.setdefault(token, len(term_ids)))
+                posting_documents.append(document)
+                posting_frequencies.append(frequency)
+            documents.append(
+                (
+                    *pool.add(question["id"]),
+                    *pool.add(question["question"]),
+                    topic_id,
+                    question["difficulty"],
+                    min(len(tokens), 255),
+                )
+            )
+
+    # Number terms in token order and group the postings by term, keeping
+    # each term's documents ascending.
+    tokens = sorted(term_ids)
+    term_numbers = np.empty(len(tokens), dtype=np.int64)
+    term_numbers[[term_ids[token] for token in tokens]] = np.arange(len(tokens))
+    posting_terms = term_numbers[np.array(posting_terms, dtype=np.int64)]
+    posting_documents = np.array(posting_documents, dtype=np.uint32)
+    order = np.lexsort((posting_documents, posting_terms))
+    first_postings = np.searchsorted(posting_terms[order], np.arange(len(tokens) + 1))
+    terms = np.array(
+        [
+            (*pool.add(token), first_posting)
+            for token, first_posting in zip(tokens + [""], first_postings)
+        ],
+        dtype=TERM_DTYPE,
+    )
+    return (
+        topic_records,
+        np.array(documents, dtype=DOCUMENT_DTYPE),
+        terms,
+        posting_documents[order],
+        np.array(posting_frequencies, dtype=np.uint16)[order],
+        pool,
+    )
+
+
+def write_index(data_dir="data", output=None):
+    """Index the JSON question files in data_dir and write the index file."""
+    data_dir = Path(data_dir)
+    output = Path(output) if output else data_dir / INDEX_FILE
+    content_hash = bank_hash(load_manifest(data_dir))
+    topic_records, documents, terms, postings, frequencies, pool = compile_index(
+        read_topic_files(data_dir)
+    )
+
+    topics_offset = HEADER.size
+    documents_offset = topics_offset + TOPIC_RECORD.size * len(topic_records)
+    terms_offset = documents_offset + documents.nbytes
+    postings_offset = terms_offset + terms.nbytes
+    frequencies_offset = postings_offset + postings.nbytes
+
+    fd, tmp_output = tempfile.mkstemp(dir=output.parent, prefix=f".{output.name}.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    INDEX_MAGIC,
+                    INDEX_VERSION,
+                    0,
+                    bytes.fromhex(content_hash),
+                    len(topic_records),
+                    len(documents),
+                    len(terms) - 1,
+                    len(postings),
+                    topics_offset,
+                    documents_offset,
+                    terms_offset,
+                    postings_offset,
+                    frequencies_offset,
+                )
+            )
+            for record in topic_records:
+                f.write(TOPIC_RECORD.pack(*record))
+            for column in (documents, terms, postings, frequencies):
+                f.write(column.tobytes())
+            f.write(pool.buffer)
+        os.replace(tmp_output, output)
+    except BaseException:
+        os.unlink(tmp_output)
+        raise
+    return output
+
+
+class SearchIndex:
+    """Read-only, memory-mapped view of an inverted index file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            _,
+            content_hash,
+            self.topic_count,
+            self.document_count,
+            self.term_count,
+            self.posting_count,
+            topics_offset,
+            documents_offset,
+            terms_offset,
+            postings_offset,
+            frequencies_offset,
+        ) = HEADER.unpack_from(self.buffer, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self.buffer.close()
+            raise ValueError(f"{self.path} is not a version {INDEX_VERSION} index")
+        self.content_hash = content_hash.hex()
+        self.pool_offset = frequencies_offset + 2 * self.posting_count
+        self.topic_names = [
+            self.string(
+                *TOPIC_RECORD.unpack_from(
+                    self.buffer, topics_offset + TOPIC_RECORD.size * i
+                )
+            )
+            for i in range(self.topic_count)
+        ]
+        self.documents = np.frombuffer(
+            self.buffer,
+            dtype=DOCUMENT_DTYPE,
+            count=self.document_count,
+            offset=documents_offset,
+        )
+        self.terms = np.frombuffer(
+            self.buffer,
+            dtype=TERM_DTYPE,
+            count=self.term_count + 1,
+            offset=terms_offset,
+        )
+        self.postings = np.frombuffer(
+            self.buffer, dtype="<u4", count=self.posting_count, offset=postings_offset
+        )
+        self.frequencies = np.frombuffer(
+            self.buffer,
+            dtype="<u2",
+            count=self.posting_count,
+            offset=frequencies_offset,
+        )
+        self.average_length = (
+            float(self.documents["token_count"].mean()) if self.document_count else 0.0
+        )
+
+    def close(self):
+        # The column views have to be released before the map they point into
+        self.documents = self.terms = self.postings = self.frequencies = None
+        self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.document_count
+
+    def string(self, offset, length):
+        """Decode a string from the pool."""
+        start = self.pool_offset + offset
+        return self.buffer[start : start + length].decode("utf-8")
+
+    def term(self, token):
+        """Return the number of a token's term, or None if no question contains it."""
+        # Binary search over the sorted term records, decoding only the probes
+        encoded = token.encode("utf-8")
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            offset, length, _ = self.terms[middle]
+            start = self.pool_offset + offset
+            probe = self.buffer[start : start + length]
+            if probe < encoded:
+                low = middle + 1
+            elif probe > encoded:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def postings_of(self, term):
+        """Return the documents and term frequencies of a term."""
+        start, stop = self.terms["first_posting"][term : term + 2]
+        return self.postings[start:stop], self.frequencies[start:stop]
+
+    def search(self, query, limit=None, topics=None):
+        """Return the documents that contain every token of query, best first.
+
+        Matches are found by intersecting the terms' postings, starting from
+        the rarest term, and ranked by BM25. Returns (documents, scores)
+        arrays, restricted to the named topics if given and cut to limit.
+        """
+        tokens = set(tokenize(query))
+        terms = [self.term(token) for token in tokens]
+        if not terms or None in terms:
+            return np.empty(0, dtype=np.uint32), np.empty(0)
+        postings = sorted(
+            (self.postings_of(term) for term in terms), key=lambda p: len(p[0])
+        )
+
+        documents = postings[0][0]
+        if topics is not None:
+            topics = set(topics)
+            topic_ids = [
+                topic_id
+                for topic_id, name in enumerate(self.topic_names)
+                if name in topics
+            ]
+            documents = documents[
+                np.isin(self.documents["topic"][documents], topic_ids)
+            ]
+        for term_documents, _ in postings[1:]:
+            positions = np.searchsorted(term_documents, documents)
+            positions[positions == len(term_documents)] = 0
+            documents = documents[term_documents[positions] == documents]
+
+        lengths = self.documents["token_count"][documents].astype(np.float64)
+        norms = K1 * (1 - B + B * lengths / max(self.average_length, 1.0))
+        scores = np.zeros(len(documents))
+        for term_documents, frequencies in postings:
+            idf = np.log(
+                1
+                + (self.document_count - len(term_documents) + 0.5)
+                / (len(term_documents) + 0.5)
+            )
+            tf = frequencies[np.searchsorted(term_documents, documents)].astype(
+                np.float64
+            )
+            scores += idf * tf * (K1 + 1) / (tf + norms)
+
+        if limit is not None and limit < len(documents):
+            best = np.argpartition(-scores, limit)[:limit]
+            documents, scores = documents[best], scores[best]
+        # Ties keep bank order
+        order = np.lexsort((documents, -scores))
+        return documents[order], scores[order]
+
+    def document(self, number):
+        """Return a document as {"id", "topic", "level", "question"}."""
+        document = self.documents[number]
+        difficulty = int(document["difficulty"])
+        return {
+            "id": self.string(document["id_offset"], document["id_length"]),
+            "topic": self.topic_names[document["topic"]],
+            "level": (
+                SKILL_LEVELS[difficulty - 1]
+                if 1 <= difficulty <= len(SKILL_LEVELS)
+                else SKILL_LEVELS[0]
+            ),
+            "question": self.string(document["text_offset"], document["text_length"]),
+        }
+
+    def question_ids(self, documents):
+        """Return the question ids of documents."""
+        return [
+            self.string(document["id_offset"], document["id_length"])
+            for document in self.documents[documents]
+        ]
+
+
+def open_index(data_dir="data"):
+    """Open the index in data_dir, building it first if it is missing or stale.
+
+    The index is stale when the question files' content hash no longer
+    matches the one it was built from.
+    """
+    data_dir = Path(data_dir)
+    path = data_dir / INDEX_FILE
+    content_hash = bank_hash(load_manifest(data_dir))
+    try:
+        index = SearchIndex(path)
+    except (OSError, ValueError, struct.error):
+        index = None
+    if index is not None and index.content_hash == content_hash:
+        return index
+    if index is not None:
+        index.close()
+    write_index(data_dir, path)
+    return SearchIndex(path)
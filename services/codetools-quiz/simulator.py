@@ -0,0 +1,159 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+
+LEVEL_COUNT = 5
+# Difficulty of each level on the ability scale, beginner to master
+LEVEL_DIFFICULTIES = np.linspace(-2.0, 2.0, LEVEL_COUNT)
+CHUNK_SIZE = 250_000
+
+
+def skill_profiles(abilities, guess_rate=0.25, discrimination=1.7):
+    """Return each candidate's probability of answering each level correctly.
+
+    Uses a three-parameter logistic model: a candidate of ability theta
+    answers a level of difficulty b correctly with probability
+    guess_rate + (1 - guess_rate) / (1 + exp(-discrimination * (theta - b))).
+    """
+    logits = discrimination * (abilities[:, None] - LEVEL_DIFFICULTIES[None, :])
+    return guess_rate + (1 - guess_rate) / (1 + np.exp(-logits))
+
+
+def simulate_level(p_correct, questions, pass_threshold, fail_threshold, rng):
+    """Run every candidate through one difficulty level at once.
+
+    Mirrors KnowledgeTest.process_difficulty_level: a level is passed after
+    pass_threshold consecutive correct answers, failed after fail_threshold
+    consecutive incorrect ones, and otherwise not passed once its questions
+    run out. Returns (passed, questions_asked) per candidate.
+    """
+    n = len(p_correct)
+    consecutive_correct = np.zeros(n, dtype=np.int32)
+    consecutive_incorrect = np.zeros(n, dtype=np.int32)
+    done = np.zeros(n, dtype=bool)
+    passed = np.zeros(n, dtype=bool)
+    asked = np.zeros(n, dtype=np.int32)
+
+    for _ in range(questions):
+        active = ~done
+        if not active.any():
+            break
+        correct = rng.random(n) < p_correct
+        asked += active
+        consecutive_correct = np.where(
+            active, np.where(correct, consecutive_correct + 1, 0), consecutive_correct
+        )
+        consecutive_incorrect = np.where(
+            active,
+            np.where(correct, 0, consecutive_incorrect + 1),
+            consecutive_incorrect,
+        )
+        failed_now = active & (consecutive_incorrect >= fail_threshold)
+        passed_now = active & ~failed_now & (consecutive_correct >= pass_threshold)
+        passed |= passed_now
+        done |= failed_now | passed_now
+    return passed, asked
+
+
+def simulate_chunk(args):
+    """Simulate one chunk of candidates for one threshold pair.
+
+    Returns (misclassified, questions_asked) totals for the chunk.
+    """
+    (
+        candidates,
+        pass_threshold,
+        fail_threshold,
+        questions_per_level,
+        ability_mean,
+        ability_sd,
+        guess_rate,
+        mastery,
+        seed,
+    ) = args
+    rng = np.random.default_rng(seed)
+    profiles = skill_profiles(
+        rng.normal(ability_mean, ability_sd, candidates), guess_rate=guess_rate
+    )
+    # A candidate's true level is the number of levels they have mastered;
+    # probabilities fall with difficulty, so mastered levels are the lowest.
+    true_levels = (profiles >= mastery).sum(axis=1)
+
+    placed_levels = np.zeros(candidates, dtype=np.int32)
+    asked = np.zeros(candidates, dtype=np.int64)
+    for level in range(LEVEL_COUNT):
+        passed, level_asked = simulate_level(
+            profiles[:, level],
+            questions_per_level,
+            pass_threshold,
+            fail_threshold,
+            rng,
+        )
+        placed_levels = np.where(passed, level + 1, placed_levels)
+        asked += level_asked
+    return int((placed_levels != true_levels).sum()), int(asked.sum())
+
+
+def simulate_policy(
+    pass_thresholds,
+    fail_thresholds,
+    candidates=1_000_000,
+    questions_per_level=20,
+    ability_mean=0.0,
+    ability_sd=1.0,
+    guess_rate=0.25,
+    mastery=0.8,
+    workers=None,
+    seed=None,
+):
+    """Simulate candidates through the adaptive policy for each threshold pair.
+
+    A candidate is placed at the highest level they passed, and misclassified
+    when that differs from the number of levels they have mastered (answer
+    correctly with probability >= mastery). Chunks of candidates run in
+    parallel across worker processes. Returns one result per threshold pair.
+    """
+    if candidates < 1:
+        raise ValueError(f"candidates must be at least 1, not {candidates}")
+    pairs = list(product(pass_thresholds, fail_thresholds))
+    chunks = [
+        min(CHUNK_SIZE, candidates - start)
+        for start in range(0, candidates, CHUNK_SIZE)
+    ]
+    seeds = np.random.SeedSequence(seed).spawn(len(pairs) * len(chunks))
+    tasks = [
+        (
+            chunk,
+            pass_threshold,
+            fail_threshold,
+            questions_per_level,
+            ability_mean,
+            ability_sd,
+            guess_rate,
+            mastery,
+            seeds[pair_index * len(chunks) + chunk_index],
+        )
+        for pair_index, (pass_threshold, fail_threshold) in enumerate(pairs)
+        for chunk_index, chunk in enumerate(chunks)
+    ]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        chunk_results = list(executor.map(simulate_chunk, tasks))
+
+    results = []
+    for pair_index, (pass_threshold, fail_threshold) in enumerate(pairs):
+        pair_results = chunk_results[
+            pair_index * len(chunks) : (pair_index + 1) * len(chunks)
+        ]
+        misclassified = sum(result[0] for result in pair_results)
+        asked = sum(result[1] for result in pair_results)
+        results.append(
+            {
+                "pass_threshold": pass_threshold,
+                "fail_threshold": fail_threshold,
+                "misclassification_rate": misclassified / candidates,
+                "mean_questions": asked / candidates,
+            }
+        )
+    return results
@@ -0,0 +1,182 @@
+import json
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+import yaml
+
+from journal import Journal
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tests (
+    name TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    answer_count INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    completed_at REAL
+);
+CREATE INDEX IF NOT EXISTS tests_updated_at ON tests (updated_at);
+CREATE TABLE IF NOT EXISTS answers (
+    test_name TEXT NOT NULL REFERENCES tests (name) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    entry TEXT NOT NULL,
+    PRIMARY KEY (test_name, seq)
+) WITHOUT ROWID;
+"""
+
+
+class SqliteTestStore:
+    """SQLite database of saved tests, safe to share between CLI processes.
+
+    The database runs in WAL mode so readers never block the writer, and
+    concurrent writers wait on the busy timeout instead of failing.
+    """
+
+    def __init__(self, path, timeout=30.0):
+        self.path = Path(path)
+        self.connection = sqlite3.connect(
+            self.path, timeout=timeout, isolation_level=None
+        )
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def transaction(self):
+        """Open a write transaction, taking the write lock up front."""
+        return Transaction(self.connection)
+
+    def test(self, name):
+        """Return a journal-like handle on one saved test."""
+        return SqliteTestRecord(self, name)
+
+    def list_tests(self, limit=None):
+        """Return (name, updated_at, completed_at) for saved tests, newest first."""
+        query = (
+            "SELECT name, updated_at, completed_at FROM tests ORDER BY updated_at DESC"
+        )
+        if limit:
+            return self.connection.execute(f"{query} LIMIT ?", (limit,)).fetchall()
+        return self.connection.execute(query).fetchall()
+
+    def mark_completed(self, name):
+        with self.transaction():
+            self.connection.execute(
+                "UPDATE tests SET completed_at = ? WHERE name = ?", (time.time(), name)
+            )
+
+    def import_state_file(self, path):
+        """Import a {name}_state.yaml file and its answer log, returning the test name."""
+        path = Path(path)
+        name = re.sub(r"_state$", "", path.stem)
+        state, answers = Journal(path).load()
+        if state is None:
+            raise ValueError(f"{path} does not contain a saved test")
+        record = self.test(name)
+        with self.transaction():
+            self.connection.execute("DELETE FROM answers WHERE test_name = ?", (name,))
+            record.write_state(state, answer_count=len(answers))
+            self.connection.executemany(
+                "INSERT INTO answers (test_name, seq, entry) VALUES (?, ?, ?)",
+                [
+                    (name, seq, json.dumps(answer, separators=(",", ":")))
+                    for seq, answer in enumerate(answers)
+                ],
+            )
+        return name
+
+
+class Transaction:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        return self.connection
+
+    def __exit__(self, exc_type, *exc_info):
+        self.connection.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class SqliteTestRecord:
+    """One test in a SqliteTestStore, with the same interface as a Journal."""
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+        self.entry_count = 0
+
+    def exists(self):
+        row = self.store.connection.execute(
+            "SELECT 1 FROM tests WHERE name = ?", (self.name,)
+        ).fetchone()
+        return row is not None
+
+    def load(self):
+        """Return the saved state (or None) and the logged answers."""
+        connection = self.store.connection
+        row = connection.execute(
+            "SELECT state FROM tests WHERE name = ?", (self.name,)
+        ).fetchone()
+        if row is None:
+            return None, []
+        answers = [
+            json.loads(entry)
+            for (entry,) in connection.execute(
+                "SELECT entry FROM answers WHERE test_name = ? ORDER BY seq",
+                (self.name,),
+            )
+        ]
+        self.entry_count = len(answers)
+        return yaml.safe_load(row[0]), answers
+
+    def append(self, entry):
+        with self.store.transaction() as connection:
+            connection.execute(
+                "INSERT INTO answers (test_name, seq, entry) VALUES (?, ?, ?)",
+                (self.name, self.entry_count, json.dumps(entry, separators=(",", ":"))),
+            )
+            connection.execute(
+                "UPDATE tests SET answer_count = ?, updated_at = ? WHERE name = ?",
+                (self.entry_count + 1, time.time(), self.name),
+            )
+        self.entry_count += 1
+
+    def needs_compaction(self):
+        return False
+
+    def flush(self):
+        pass  # Every write is already its own committed transaction
+
+    def snapshot(self, state, clear_log=True):
+        with self.store.transaction() as connection:
+            if clear_log:
+                connection.execute(
+                    "DELETE FROM answers WHERE test_name = ?", (self.name,)
+                )
+                self.entry_count = 0
+            self.write_state(state, answer_count=self.entry_count)
+            if clear_log:
+                connection.execute(
+                    "UPDATE tests SET completed_at = NULL WHERE name = ?", (self.name,)
+                )
+
+    def write_state(self, state, answer_count):
+        """Insert or replace the test's state; must run inside a transaction."""
+        now = time.time()
+        self.store.connection.execute(
+            """
+            INSERT INTO tests (name, state, answer_count, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET
+                state = excluded.state,
+                answer_count = excluded.answer_count,
+                updated_at = excluded.updated_at
+            """,
+            (self.name, yaml.safe_dump(state), answer_count, now, now),
+        )
@@ -0,0 +1,36 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(APP_DIR / "benchmarks"))
+
+from persistence import get_writer  # noqa: E402
+
+TOPIC_FILES = ("git_data.json", "python_data.json")
+
+
+@pytest.fixture
+def copy_topics():
+    """Fixture to copy topic files of the real bank into a directory."""
+
+    def copy(data_dir, names=TOPIC_FILES):
+        data_dir.mkdir(parents=True, exist_ok=True)
+        for name in names:
+            shutil.copy2(APP_DIR / "data" / name, data_dir / name)
+        return data_dir
+
+    return copy
+
+
+@pytest.fixture
+def quiz_dir(tmp_path, monkeypatch, copy_topics):
+    """Fixture to run the CLI in a directory with two topics of the bank."""
+    copy_topics(tmp_path / "data")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("QUIZ_WAREHOUSE", str(tmp_path / "results"))
+    yield tmp_path
+    get_writer().flush()  # Before leaving the directory the state is saved in
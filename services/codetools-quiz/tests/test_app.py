@@ -0,0 +1,62 @@
+import json
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import app
+
+
+def test_question_bank_is_built_once_per_content_hash(quiz_dir):
+    st.cache_resource.clear()
+
+    bank = app.get_question_bank()
+    assert app.get_question_bank() is bank
+    stats = app.question_bank_cache_stats()
+    assert (stats["requests"], stats["builds"]) == (2, 1)
+
+    # Editing a question file changes the content hash and rebuilds the bank
+    path = quiz_dir / "data" / "git_data.json"
+    with open(path) as f:
+        topic = json.load(f)
+    topic["questions"] = topic["questions"][:1]
+    with open(path, "w") as f:
+        json.dump(topic, f)
+    rebuilt = app.get_question_bank()
+    assert rebuilt is not bank
+    assert len(rebuilt) < len(bank)
+    assert stats["builds"] == 2
+
+
+def test_knowledge_level_chart_is_built_once_per_set_of_levels():
+    st.session_state.clear()
+    levels = {"Git": 2, "Python": 0}
+
+    figure, svg = app.get_knowledge_level_chart(levels)
+    cached_figure, cached_svg = app.get_knowledge_level_chart(dict(levels))
+    assert cached_figure is figure
+    assert cached_svg is svg
+
+    new_figure, new_svg = app.get_knowledge_level_chart({"Git": 3, "Python": 0})
+    assert new_figure is not figure
+    assert new_svg != svg
+    st.session_state.clear()
+
+
+def test_debugger_pages_the_table_and_updates_it_in_place(quiz_dir, copy_topics):
+    copy_topics(quiz_dir / "data", ["aws_data.json"])
+    at = AppTest.from_file(app.__file__, default_timeout=30)
+    at.run()
+    assert "debug_frame" not in at.session_state
+
+    at.toggle(key="show_debugger").set_value(True).run()
+    questions = len(at.session_state["data"])
+    assert questions > app.DEBUG_PAGE_SIZE
+    assert len(at.dataframe[0].value) == app.DEBUG_PAGE_SIZE
+    at.number_input(key="debug_page").set_value(2).run()
+    assert len(at.dataframe[0].value) == questions - app.DEBUG_PAGE_SIZE
+
+    frame = at.session_state["debug_frame"]
+    radio = at.radio[0]
+    radio.set_value(radio.options[0]).run()
+    assert at.session_state["debug_frame"] is frame
+    assert frame.at[0, "selected_answer"] == radio.options[0]
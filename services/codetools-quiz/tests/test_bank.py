@@ -0,0 +1,67 @@
+import os
+from collections import Counter
+
+import app
+from bank import QuestionBank, open_bank, pack_bank, read_topic_files
+
+
+def test_open_bank_repacks_after_topic_file_removed(tmp_path, copy_topics):
+    copy_topics(tmp_path, ["git_data.json", "python_data.json"])
+    pack_bank(tmp_path)
+    os.remove(tmp_path / "python_data.json")
+
+    with open_bank(tmp_path) as bank:
+        assert bank.topic_names() == ["Git"]
+
+
+def test_open_bank_repacks_after_older_topic_file_added(tmp_path, copy_topics):
+    copy_topics(tmp_path, ["git_data.json"])
+    pack_bank(tmp_path)
+    copy_topics(tmp_path, ["python_data.json"])
+    os.utime(tmp_path / "python_data.json", (0, 0))
+
+    with open_bank(tmp_path) as bank:
+        assert bank.topic_names() == ["Git", "Python"]
+
+
+def test_open_bank_without_packed_bank(tmp_path, copy_topics):
+    copy_topics(tmp_path, ["git_data.json"])
+    assert open_bank(tmp_path) is None
+
+
+def test_packed_bank_matches_topic_files(tmp_path, copy_topics):
+    copy_topics(tmp_path)
+    pack_bank(tmp_path)
+
+    with open_bank(tmp_path) as bank:
+        assert len(bank) == 2
+        for topic, source in zip(bank, read_topic_files(tmp_path)):
+            assert topic["topic"] == source["topic"]
+            assert topic["questions"] == [
+                {key: q[key] for key in ("id", "difficulty", "question")}
+                for q in source["questions"]
+            ]
+            assert topic["choices"] == source["choices"]
+
+
+def test_select_matches_filtering_every_record(tmp_path, copy_topics):
+    copy_topics(tmp_path)
+    bank = QuestionBank.from_topics(list(read_topic_files(tmp_path)))
+    every_record = bank.records(range(len(bank)))
+
+    for topics in ([], ["Python"]):
+        assert bank.records(bank.select(3, topics)) == app.filter_questions(
+            every_record, 3, topics
+        )
+
+
+def test_select_samples_each_bucket_by_seed(tmp_path, copy_topics):
+    copy_topics(tmp_path)
+    bank = QuestionBank.from_topics(list(read_topic_files(tmp_path)))
+
+    rows = bank.select(2, randomize=True, seed=1)
+    assert list(rows) == list(bank.select(2, randomize=True, seed=1))
+    assert list(rows) != list(bank.select(2, randomize=True, seed=2))
+    buckets = Counter((q["topic"], q["level"]) for q in bank.records(rows))
+    assert len(buckets) == len(bank.records(bank.select(1)))
+    assert set(buckets.values()) == {2}
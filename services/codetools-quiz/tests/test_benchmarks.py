@@ -0,0 +1,62 @@
+import json
+
+import bench_engine
+import rerun_latency
+from manifest import load_manifest
+
+
+def test_generate_bank(tmp_path):
+    question_count = bench_engine.generate_bank(tmp_path, scale=1)
+
+    entries = load_manifest(tmp_path)
+    assert len(entries) == bench_engine.TOPIC_COUNT
+    assert sum(sum(e["counts"].values()) for e in entries) == question_count
+    assert question_count == bench_engine.TOPIC_COUNT * 5 * 20
+
+
+def test_benchmark_scale_measures_every_hot_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    results = bench_engine.benchmark_scale(1, repeat=1)
+
+    functions = [result["function"] for result in results]
+    assert "transform_questions" in functions
+    assert "filter_questions[text]" in functions
+    assert "KnowledgeTest.update_state" in functions
+    for result in results:
+        assert result["scale"] == 1
+        assert result["seconds"] > 0
+        assert result["peak_bytes"] > 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_compare_prints_ratios(tmp_path, capsys):
+    baseline = tmp_path / "baseline.json"
+    result = {
+        "function": "filter_questions",
+        "scale": 1,
+        "seconds": 0.5,
+        "peak_bytes": 100,
+    }
+    baseline.write_text(json.dumps({"results": [dict(result, seconds=1.0)]}))
+
+    bench_engine.compare([result], baseline)
+    assert "0.50x" in capsys.readouterr().err
+
+
+def test_rerun_latency_answers_a_full_quiz(quiz_dir):
+    report = rerun_latency.run_quiz(1, timeout=30, debugger=False)
+
+    assert report["questions"] == 2 * 5
+    assert report["answers"] == report["questions"]
+    assert report["script_runs_per_answer"] >= 1
+    for name in ["wall", "script", *rerun_latency.SECTIONS]:
+        assert set(report[name]) == {"mean_ms", "p50_ms", "p95_ms", "max_ms"}
+
+
+def test_summarize():
+    assert rerun_latency.summarize([0.001, 0.002, 0.003, 0.010]) == {
+        "mean_ms": 4.0,
+        "p50_ms": 3.0,
+        "p95_ms": 10.0,
+        "max_ms": 10.0,
+    }
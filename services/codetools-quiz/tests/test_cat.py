@@ -0,0 +1,62 @@
+import numpy as np
+from click.testing import CliRunner
+
+from cat import P_CORRECT, THETA_GRID, AdaptiveSession
+from cli import cli
+
+LEVEL_COUNTS = {level: 50 for level in range(1, 6)}
+
+
+def run_session(theta, seed=0, **kwargs):
+    """Answer an adaptive session as a candidate of the given ability would."""
+    rng = np.random.default_rng(seed)
+    row = np.searchsorted(THETA_GRID, theta)
+    session = AdaptiveSession(LEVEL_COUNTS, **kwargs)
+    while (level := session.next_level()) is not None:
+        session.record(level, rng.random() < P_CORRECT[row, level - 1])
+    return session
+
+
+def test_estimate_recovers_the_ability():
+    for theta in (-2.0, 0.0, 2.0):
+        errors = [
+            run_session(theta, seed, target_se=0.3, max_questions=100).estimate()[0]
+            - theta
+            for seed in range(20)
+        ]
+        assert abs(np.mean(errors)) < 0.5
+
+
+def test_session_stops_at_target_se_or_max_questions():
+    session = run_session(0.0, target_se=0.4, max_questions=100)
+    assert session.estimate()[1] <= 0.4
+    assert run_session(0.0, target_se=0.0, max_questions=7).question_count == 7
+
+
+def test_only_levels_with_questions_left_are_asked():
+    session = AdaptiveSession({1: 1, 2: 0, 3: 0, 4: 0, 5: 1}, max_questions=10)
+    levels = []
+    while (level := session.next_level()) is not None:
+        levels.append(level)
+        session.record(level, True)
+    assert sorted(levels) == [1, 5]
+
+
+def test_placement_follows_the_answers():
+    always_right, always_wrong = AdaptiveSession(LEVEL_COUNTS), AdaptiveSession(
+        LEVEL_COUNTS
+    )
+    for _ in range(20):
+        always_right.record(5, True)
+        always_wrong.record(1, False)
+    assert always_right.placement() == 5
+    assert always_wrong.placement() == 0
+
+
+def test_start_adaptive_test(quiz_dir):
+    result = CliRunner().invoke(
+        cli, ["start", "--mode", "cat", "--include", "git"], "5\n" * 40
+    )
+    assert result.exception is None, result.output
+    assert "Topic: Git" in result.output
+    assert "Levels Passed: None" in result.output
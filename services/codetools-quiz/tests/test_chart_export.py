@@ -0,0 +1,21 @@
+import xml.etree.ElementTree as ET
+
+from chart_export import LEVEL_COLORS, knowledge_level_svg
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def test_svg_has_a_wedge_per_started_topic():
+    svg = ET.fromstring(knowledge_level_svg({"Git": 2, "Python": 0, "R&D": 5}))
+
+    wedges = svg.findall(f"{SVG}path")
+    assert [wedge.get("fill") for wedge in wedges] == [LEVEL_COLORS[2], LEVEL_COLORS[5]]
+    labels = [text.text for text in svg.findall(f"{SVG}text")]
+    assert {"Git", "Python", "R&D"} <= set(labels)
+
+
+def test_svg_of_a_single_topic():
+    svg = ET.fromstring(knowledge_level_svg({"Git": 1}))
+    assert svg.find(f"{SVG}path") is None
+    fills = [circle.get("fill") for circle in svg.findall(f"{SVG}circle")]
+    assert LEVEL_COLORS[1] in fills
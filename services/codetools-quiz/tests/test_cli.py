@@ -0,0 +1,22 @@
+from click.testing import CliRunner
+
+from cli import cli
+from persistence import get_writer
+
+
+def test_start_with_existing_name_resumes_saved_test(quiz_dir):
+    runner = CliRunner()
+    # Answer one question, then stop at the next prompt
+    result = runner.invoke(cli, ["start", "--name", "t", "--include", "git"], "5\n")
+    assert isinstance(result.exception, SystemExit)
+    get_writer().flush()  # As the CLI does when it exits
+    assert (quiz_dir / "t_state.yaml").exists()
+
+    # Failing every level finishes the test
+    result = runner.invoke(
+        cli, ["start", "--name", "t", "--include", "python"], "5\n" * 15
+    )
+    assert result.exception is None, result.output
+    assert "Resuming the saved test 't'." in result.output
+    assert "Topic: Git" in result.output
+    assert "Python" not in result.output
@@ -0,0 +1,35 @@
+import pytest
+from click.testing import CliRunner
+
+from cli import cli
+from grading import SheetError, read_sheets
+
+
+def test_grade_reports_sheet_without_seed_column(tmp_path):
+    sheet = tmp_path / "sheets.csv"
+    sheet.write_text("test,question_id,answer\nt1,q1,1\n")
+
+    result = CliRunner().invoke(cli, ["grade", str(sheet)])
+    assert result.exit_code == 1
+    assert f"{sheet}, line 1: missing column(s) seed" in result.output
+
+
+def test_read_sheets_reports_bad_row(tmp_path):
+    sheet = tmp_path / "sheets.ndjson"
+    sheet.write_text(
+        '{"test": "t1", "seed": 1, "question_id": "q1", "answer": 1}\n'
+        '{"test": "t1", "seed": 1, "question_id": "q2", "answer": "x"}\n'
+    )
+
+    with pytest.raises(SheetError, match=r"sheets.ndjson, line 2: "):
+        list(read_sheets([str(sheet)]))
+
+
+def test_read_sheets(tmp_path):
+    sheet = tmp_path / "sheets.csv"
+    sheet.write_text("test,seed,question_id,answer\nt1,7,q1,1\nt1,7,q2,6\nt2,8,q1,5\n")
+
+    assert list(read_sheets([str(sheet)])) == [
+        {"test": "t1", "seed": 7, "answers": {"q1": 1, "q2": 6}},
+        {"test": "t2", "seed": 8, "answers": {"q1": 5}},
+    ]
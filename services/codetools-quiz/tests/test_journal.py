@@ -0,0 +1,67 @@
+from app import replay_action
+from journal import Journal
+
+
+def make_state():
+    return {
+        "data": [{"selected_answer": None} for _ in range(4)],
+        "current_index": 0,
+        "quiz_complete": False,
+    }
+
+
+def replay(journal):
+    state, entries = Journal(journal.snapshot_path).load()
+    for entry in entries:
+        replay_action(state, entry)
+    return state
+
+
+def test_snapshot_and_log_replay_to_the_saved_state(tmp_path):
+    journal = Journal(tmp_path / "state.yaml", compact_every=3)
+    state = make_state()
+    journal.snapshot(state)
+
+    for index, answer in enumerate("abcd"):
+        for entry in (
+            {"name": "SELECT_ANSWER", "index": index, "payload": answer},
+            {"name": "GOTO_NEXT_QUESTION", "index": index + 1, "quiz_complete": False},
+        ):
+            replay_action(state, entry)
+            journal.append(entry)
+            if journal.needs_compaction():
+                journal.snapshot(state)
+                assert journal.log_path.stat().st_size == 0
+
+    assert replay(journal) == state
+    assert [q["selected_answer"] for q in state["data"]] == list("abcd")
+
+
+def test_stale_entries_replay_onto_a_newer_snapshot(tmp_path):
+    journal = Journal(tmp_path / "state.yaml")
+    state = make_state()
+    journal.snapshot(state)
+    entry = {"name": "SELECT_ANSWER", "index": 1, "payload": "b"}
+    replay_action(state, entry)
+    journal.append(entry)
+    # As if a crash happened after the snapshot was written, before the log was cleared
+    journal.snapshot(state, clear_log=False)
+
+    assert replay(journal) == state
+
+
+def test_torn_append_is_dropped_before_next_append(tmp_path):
+    journal = Journal(tmp_path / "state.yaml")
+    journal.snapshot({"answers": {}})
+    journal.append({"a": 1})
+    # An append interrupted before its newline still parses as JSON
+    with open(journal.log_path, "a") as file:
+        file.write('{"a": 2}')
+
+    _, entries = Journal(journal.snapshot_path).load()
+    assert entries == [{"a": 1}]
+    journal.append({"a": 3})
+    journal.append({"a": 4})
+
+    _, entries = Journal(journal.snapshot_path).load()
+    assert entries == [{"a": 1}, {"a": 3}, {"a": 4}]
@@ -0,0 +1,56 @@
+import json
+import os
+
+from click.testing import CliRunner
+
+import manifest
+from cli import cli, load_questions
+from manifest import MANIFEST_FILE, bank_hash, load_manifest
+
+
+def test_load_manifest_summarizes_topic_files(tmp_path, copy_topics):
+    copy_topics(tmp_path)
+
+    entries = load_manifest(tmp_path)
+    assert [(e["topic"], e["key"], e["path"]) for e in entries] == [
+        ("Git", "git", "git_data.json"),
+        ("Python", "python", "python_data.json"),
+    ]
+    with open(tmp_path / "git_data.json") as f:
+        questions = json.load(f)["questions"]
+    assert sum(entries[0]["counts"].values()) == len(questions)
+    assert (tmp_path / MANIFEST_FILE).exists()
+
+
+def test_load_manifest_only_parses_changed_files(tmp_path, copy_topics, monkeypatch):
+    copy_topics(tmp_path)
+    entries = load_manifest(tmp_path)
+
+    def build_entry(path, content_hash, stat):
+        raise AssertionError(f"{path.name} was parsed again")
+
+    # A touched but unchanged file is hashed, not parsed
+    monkeypatch.setattr(manifest, "build_entry", build_entry)
+    os.utime(tmp_path / "git_data.json", (0, 0))
+    assert bank_hash(load_manifest(tmp_path)) == bank_hash(entries)
+
+    monkeypatch.undo()
+    with open(tmp_path / "git_data.json") as f:
+        topic = json.load(f)
+    topic["topic"] = "Gitflow"
+    with open(tmp_path / "git_data.json", "w") as f:
+        json.dump(topic, f)
+    changed = load_manifest(tmp_path)
+    assert changed[0]["key"] == "gitflow"
+    assert bank_hash(changed) != bank_hash(entries)
+
+
+def test_list_topics_and_included_topics(quiz_dir):
+    result = CliRunner().invoke(cli, ["list-topics"])
+    assert result.output == "Available Topics:\n- Git\n- Python\n"
+    assert [topic["topic"] for topic in load_questions(included_topics={"python"})] == [
+        "Python"
+    ]
+    assert [topic["topic"] for topic in load_questions(excluded_topics={"python"})] == [
+        "Git"
+    ]
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from journal import Journal
+from persistence import WriteBehind
+
+
+class SlowFile:
+    """Stands in for a journal whose writes take a while."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.written = False
+
+    def flush(self):
+        self.started.set()
+        time.sleep(0.2)
+        self.written = True
+
+
+class CountingFile:
+    def __init__(self):
+        self.flushes = 0
+        self.flushed = threading.Event()
+
+    def flush(self):
+        self.flushes += 1
+        self.flushed.set()
+
+
+class FailingFile:
+    def flush(self):
+        raise OSError("disk full")
+
+
+def test_flush_waits_for_write_in_progress():
+    writer = WriteBehind(window=0, max_delay=0)
+    slow_file = SlowFile()
+    writer.schedule(slow_file)
+    assert slow_file.started.wait(1)
+
+    writer.flush()
+    assert slow_file.written
+
+
+def test_failed_write_is_logged(caplog):
+    writer = WriteBehind(window=0, max_delay=0)
+    slow_file = SlowFile()
+    writer.schedule(FailingFile())
+    writer.schedule(slow_file)
+    assert slow_file.started.wait(1)
+
+    writer.flush()
+    assert "disk full" in caplog.text
+
+
+def test_burst_of_changes_is_flushed_once():
+    writer = WriteBehind(window=0.2, max_delay=5)
+    file = CountingFile()
+    for _ in range(20):
+        writer.schedule(file)
+    assert not file.flushed.is_set()
+
+    assert file.flushed.wait(2)
+    time.sleep(0.3)
+    assert file.flushes == 1
+
+
+def test_changes_wait_at_most_max_delay():
+    writer = WriteBehind(window=0.2, max_delay=0.3)
+    file = CountingFile()
+    started = time.monotonic()
+    # Changes keep arriving within the window, but the first one is due anyway
+    while not file.flushed.is_set() and time.monotonic() - started < 2:
+        writer.schedule(file)
+        time.sleep(0.05)
+    assert file.flushed.is_set()
+    assert time.monotonic() - started < 1
+
+
+def test_journal_writes_are_buffered_until_flushed(tmp_path):
+    writer = WriteBehind(window=60, max_delay=60)
+    journal = Journal(tmp_path / "state.yaml", writer=writer)
+    journal.snapshot({"answers": []})
+    journal.append({"answer": 1})
+    assert journal.exists()
+    assert not journal.snapshot_path.exists()
+
+    writer.flush()
+    assert Journal(journal.snapshot_path).load() == ({"answers": []}, [{"answer": 1}])
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from quiz_index import QuizIndex
+
+
+def make_quiz():
+    return [
+        {"topic": topic, "level": level, "selected_answer": None}
+        for topic in ("Git", "Python")
+        for level in ("beginner", "intermediate")
+        for _ in range(3)
+    ]
+
+
+def scanned_progress(questions, topic, level=None):
+    group = [
+        q
+        for q in questions
+        if q["topic"] == topic and (level is None or q["level"] == level)
+    ]
+    return sum(q["selected_answer"] is not None for q in group) / len(group)
+
+
+def test_progress_matches_a_scan_of_the_quiz():
+    rng = random.Random(0)
+    questions = make_quiz()
+    quiz_index = QuizIndex(questions)
+
+    for _ in range(100):
+        question = rng.choice(questions)
+        answer = rng.choice(["a", None])
+        quiz_index.select_answer(question, answer)
+        question["selected_answer"] = answer
+
+        for topic in ("Git", "Python"):
+            assert quiz_index.progress(topic) == scanned_progress(questions, topic)
+            for level in ("beginner", "intermediate"):
+                assert quiz_index.progress(topic, level) == scanned_progress(
+                    questions, topic, level
+                )
+
+
+def test_topic_positions_and_next_topic_start():
+    quiz_index = QuizIndex(make_quiz())
+    assert quiz_index.topics == ["Git", "Python"]
+    assert quiz_index.topic_positions == {"Git": 0, "Python": 1}
+    assert quiz_index.next_topic_start("Git") == 6
+    assert quiz_index.next_topic_start("Python") is None
+
+
+def test_questions_of_a_topic_must_be_contiguous():
+    questions = make_quiz()
+    questions.append(dict(questions[0]))
+    with pytest.raises(ValueError, match="not contiguous"):
+        QuizIndex(questions)
@@ -0,0 +1,49 @@
+import random
+
+from config import SKILL_LEVELS
+from scoring import ScoreAggregator
+
+
+def make_questions():
+    return [
+        {
+            "topic": topic,
+            "level": level,
+            "correct_answer": "a",
+            "selected_answer": None,
+        }
+        for topic in ("Git", "Python")
+        for level in SKILL_LEVELS
+        for _ in range(3)
+    ]
+
+
+def test_incremental_scores_match_a_full_recount():
+    rng = random.Random(0)
+    questions = make_questions()
+    scores = ScoreAggregator(questions)
+
+    for _ in range(200):
+        question = rng.choice(questions)
+        answer = rng.choice("ab")
+        scores.select_answer(question, answer)
+        question["selected_answer"] = answer
+
+        recount = ScoreAggregator(questions)
+        assert scores.scores == recount.scores
+        assert scores.highest_levels == recount.highest_levels
+
+
+def test_highest_level_is_the_highest_passed_level():
+    questions = make_questions()
+    scores = ScoreAggregator(questions)
+    assert scores.highest_levels == {"Git": 0, "Python": 0}
+
+    for question in questions:
+        if question["topic"] == "Git" and question["level"] in SKILL_LEVELS[1:3]:
+            scores.select_answer(question, "a")
+            question["selected_answer"] = "a"
+    assert scores.highest_levels == {"Git": 3, "Python": 0}
+    assert scores.has_passed("Git", SKILL_LEVELS[1])
+    assert not scores.has_passed("Git", SKILL_LEVELS[0])
+    assert not scores.has_passed("Rust", SKILL_LEVELS[0])
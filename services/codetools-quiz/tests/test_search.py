@@ -0,0 +1,31 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from bank import open_bank, pack_bank
+from search import open_index, write_index
+
+
+def test_search_matches_every_word(tmp_path, copy_topics):
+    copy_topics(tmp_path)
+    with open_index(tmp_path) as index:
+        documents, _ = index.search("remote branch", topics=["Git"])
+        assert len(documents)
+        for document in documents:
+            question = index.document(document)["question"].lower()
+            assert "remote" in question and "branch" in question
+
+
+def test_concurrent_rebuilds(tmp_path, copy_topics):
+    copy_topics(tmp_path)
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda _: write_index(tmp_path), range(16)))
+        list(executor.map(lambda _: pack_bank(tmp_path), range(16)))
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "git_data.json",
+        "python_data.json",
+        "questions.bank",
+        "questions.index",
+        "topics.manifest",
+    ]
+    with open_index(tmp_path) as index, open_bank(tmp_path) as bank:
+        assert index.topic_names == bank.topic_names() == ["Git", "Python"]
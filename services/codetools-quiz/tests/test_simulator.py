@@ -0,0 +1,27 @@
+import pytest
+from click.testing import CliRunner
+
+from cli import cli
+from simulator import simulate_policy
+
+
+def test_simulate_policy_reports_each_threshold_pair():
+    results = simulate_policy([3, 4], [2], candidates=500, workers=1, seed=0)
+    assert [(r["pass_threshold"], r["fail_threshold"]) for r in results] == [
+        (3, 2),
+        (4, 2),
+    ]
+    for result in results:
+        assert 0 <= result["misclassification_rate"] <= 1
+        assert result["mean_questions"] > 0
+
+
+def test_simulate_policy_rejects_no_candidates():
+    with pytest.raises(ValueError, match="candidates must be at least 1"):
+        simulate_policy([3], [2], candidates=0)
+
+
+def test_simulate_rejects_no_candidates():
+    result = CliRunner().invoke(cli, ["simulate", "--candidates", "0"])
+    assert result.exit_code == 2
+    assert "--candidates" in result.output
@@ -0,0 +1,65 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from click.testing import CliRunner
+
+from cli import cli
+from journal import Journal
+from store import SqliteTestStore
+
+
+def test_record_round_trip(tmp_path):
+    store = SqliteTestStore(tmp_path / "tests.db")
+    record = store.test("t")
+    assert not record.exists()
+    assert record.load() == (None, [])
+
+    record.snapshot({"answers": []})
+    record.append({"answer": 1})
+    record.append({"answer": 2})
+    assert store.test("t").load() == ({"answers": []}, [{"answer": 1}, {"answer": 2}])
+
+    record.snapshot({"answers": [1, 2]})
+    assert store.test("t").load() == ({"answers": [1, 2]}, [])
+    store.close()
+
+
+def test_concurrent_writers(tmp_path):
+    path = tmp_path / "tests.db"
+    SqliteTestStore(path).close()
+
+    def run_test(name):
+        # One connection per writer, as with separate CLI processes
+        store = SqliteTestStore(path)
+        record = store.test(name)
+        record.snapshot({"name": name})
+        for answer in range(20):
+            record.append({"answer": answer})
+        store.close()
+
+    names = [f"t{i}" for i in range(8)]
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(run_test, names))
+
+    store = SqliteTestStore(path)
+    assert sorted(name for name, _, _ in store.list_tests()) == names
+    for name in names:
+        state, answers = store.test(name).load()
+        assert state == {"name": name}
+        assert answers == [{"answer": answer} for answer in range(20)]
+    store.close()
+
+
+def test_import_state_files(quiz_dir):
+    journal = Journal(quiz_dir / "t_state.yaml")
+    journal.snapshot({"answers": []})
+    journal.append({"answer": 3})
+
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--store", "tests.db", "import-state", "t_state.yaml"])
+    assert result.exception is None, result.output
+    result = runner.invoke(cli, ["--store", "tests.db", "list-tests"])
+    assert "- t (in progress, updated " in result.output
+
+    store = SqliteTestStore(quiz_dir / "tests.db")
+    assert store.test("t").load() == ({"answers": []}, [{"answer": 3}])
+    store.close()
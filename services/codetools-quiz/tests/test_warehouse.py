@@ -0,0 +1,55 @@
+from scoring import ScoreAggregator
+from warehouse import append_session, pass_rates, quiz_levels
+
+
+def answer(correct):
+    return {
+        "topic": "Git",
+        "level": 5,
+        "question_id": "q",
+        "selected": 0,
+        "correct": correct,
+    }
+
+
+def test_pass_rates_use_recorded_passed_flag(tmp_path):
+    # Mostly correct answers, but the level was not passed by the test's rule
+    rows = [answer(True), answer(True), answer(False)]
+    append_session(
+        "cli", "s1", rows, [{"topic": "Git", "level": 5, "passed": False}], tmp_path
+    )
+    append_session(
+        "cli", "s2", rows, [{"topic": "Git", "level": 5, "passed": True}], tmp_path
+    )
+
+    rates = pass_rates(tmp_path)
+    assert rates.loc[("Git", 5), "sessions"] == 2
+    assert rates.loc[("Git", 5), "passed"] == 1
+    assert rates.loc[("Git", 5), "pass_rate"] == 0.5
+
+
+def test_pass_rates_filter_by_source(tmp_path):
+    append_session(
+        "cli", "s1", [], [{"topic": "Git", "level": 1, "passed": True}], tmp_path
+    )
+    append_session(
+        "app", "s2", [], [{"topic": "Git", "level": 1, "passed": False}], tmp_path
+    )
+
+    assert pass_rates(tmp_path, source="app").loc[("Git", 1), "pass_rate"] == 0.0
+    assert pass_rates(tmp_path, topics=["Python"]).empty
+
+
+def test_quiz_levels_use_app_scoring():
+    questions = [
+        {
+            "topic": "Git",
+            "level": "beginner",
+            "correct_answer": "a",
+            "selected_answer": selected,
+        }
+        for selected in ("a", "a", "b")
+    ]
+    assert quiz_levels(ScoreAggregator(questions)) == [
+        {"topic": "Git", "level": 1, "passed": True}
+    ]
@@ -0,0 +1,141 @@
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from config import SKILL_LEVELS
+
+WAREHOUSE_DIR = "results"
+# One row per answer
+ANSWER_SCHEMA = pa.schema(
+    [
+        ("test", pa.string()),
+        ("topic", pa.string()),
+        ("level", pa.int8()),  # 1 (beginner) to 5 (master)
+        ("question_id", pa.string()),
+        ("selected", pa.int8()),  # Index of the chosen answer, -1 for "I don't know"
+        ("correct", pa.bool_()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+    ]
+)
+# One row per level a session took, with whether it passed by the rule of the
+# CLI or app it was taken with
+LEVEL_SCHEMA = pa.schema(
+    [
+        ("test", pa.string()),
+        ("topic", pa.string()),
+        ("level", pa.int8()),
+        ("passed", pa.bool_()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+    ]
+)
+
+
+def warehouse_dir():
+    """Return the warehouse directory, configured by QUIZ_WAREHOUSE."""
+    return Path(os.environ.get("QUIZ_WAREHOUSE", WAREHOUSE_DIR))
+
+
+def append_session(source, test, rows, levels, directory=None):
+    """Write a completed session's answers and levels as one Parquet file each.
+
+    Answers go to the answers dataset and levels to the levels dataset of the
+    warehouse. Files are partitioned by source (cli or app) and named after
+    the test, so writing a session again replaces it rather than duplicating
+    its rows. Rows and levels are dicts with the ANSWER_SCHEMA and
+    LEVEL_SCHEMA columns other than test and timestamp, which are filled in
+    with the test name and the time of writing.
+    """
+    directory = Path(directory or warehouse_dir())
+    timestamp = datetime.now(timezone.utc)
+    for dataset, schema, dataset_rows in (
+        ("levels", LEVEL_SCHEMA, levels),
+        ("answers", ANSWER_SCHEMA, rows),
+    ):
+        table = pa.Table.from_pylist(
+            [dict(row, test=test, timestamp=timestamp) for row in dataset_rows],
+            schema=schema,
+        )
+        write_partition(table, directory / dataset / f"source={source}", test)
+
+
+def write_partition(table, partition, test):
+    """Atomically write a test's table into a partition directory."""
+    partition.mkdir(parents=True, exist_ok=True)
+    path = partition / f"{test}.parquet"
+    tmp_path = partition / f".{test}.{uuid.uuid4().hex}.tmp"
+    try:
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def quiz_rows(questions):
+    """Return warehouse rows for the answered questions of a web app quiz."""
+    rows = []
+    for question in questions:
+        selected_answer = question["selected_answer"]
+        if selected_answer is None:
+            continue  # Skipped
+        choices = question["choices"]
+        rows.append(
+            {
+                "topic": question["topic"],
+                "level": SKILL_LEVELS.index(question["level"]) + 1,
+                "question_id": question.get("id"),
+                "selected": (
+                    choices.index(selected_answer) if selected_answer in choices else -1
+                ),
+                "correct": selected_answer == question["correct_answer"],
+            }
+        )
+    return rows
+
+
+def quiz_levels(scores):
+    """Return warehouse levels for a web app quiz from its ScoreAggregator."""
+    return [
+        {
+            "topic": topic,
+            "level": SKILL_LEVELS.index(level) + 1,
+            "passed": scores.has_passed(topic, level),
+        }
+        for topic, level in scores.scores
+    ]
+
+
+def pass_rates(directory=None, topics=None, source=None):
+    """Return the share of sessions that passed each topic and level.
+
+    Uses the passed flag recorded for each level a session took, so levels
+    count as passed by the same rule as in the CLI or app the session was
+    taken with. Only the topic, level and passed columns are read, and topic
+    and source filters are pushed down to the Parquet reader. Returns a
+    DataFrame indexed by (topic, level) with sessions, passed and pass_rate.
+    """
+    directory = Path(directory or warehouse_dir()) / "levels"
+    if not directory.exists():
+        return pd.DataFrame(columns=["sessions", "passed", "pass_rate"])
+
+    filters = []
+    if topics:
+        filters.append(("topic", "in", list(topics)))
+    if source:
+        filters.append(("source", "==", source))
+    levels = pd.read_parquet(
+        directory,
+        columns=["topic", "level", "passed"],
+        filters=filters or None,
+        engine="pyarrow",
+    )
+    by_level = levels.groupby(["topic", "level"], observed=True)["passed"]
+    rates = pd.DataFrame({"sessions": by_level.size(), "passed": by_level.sum()})
+    rates["pass_rate"] = rates["passed"] / rates["sessions"]
+    return rates